@@ -0,0 +1,206 @@
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import AsyncIterable, List, Optional
+
+from models.db_schemes import Project
+
+from .BaseController import BaseController
+
+
+@dataclass
+class IngestionBatch:
+    asset_records: list
+    chunks: list
+    chunk_order_offset: int = 0
+    texts: List[str] = field(default_factory=list)
+    metadata: List[dict] = field(default_factory=list)
+    chunks_ids: List[int] = field(default_factory=list)
+    vectors: Optional[List[list]] = None
+
+
+@dataclass
+class IngestionMarker:
+    """Follows the last batch of an asset group through every stage."""
+    asset_records: list
+    chunks_count: int = 0
+    is_failed: bool = False
+
+
+class IngestionController(BaseController):
+    """
+    Fused parse -> chunk -> persist -> embed -> vector insert pipeline.
+
+    Stages are connected by bounded asyncio queues, so they overlap and the total time approaches the
+    slowest stage instead of the sum of all of them, while the queue bound keeps memory flat.
+    """
+
+    def __init__(self, process_controller, nlp_controller, chunk_model):
+        super().__init__()
+
+        self.process_controller = process_controller
+        self.nlp_controller = nlp_controller
+        self.chunk_model = chunk_model
+
+        self.logger = logging.getLogger("uvicorn.error")
+
+    async def ingest(self, project: Project, asset_groups: AsyncIterable[list], chunk_size: int = 100,
+                     overlap_size: int = 20, batch_size: int = 500, queue_size: int = 4,
+                     max_parsers: int = 4, on_assets_ingested=None):
+        """
+        Ingest `asset_groups` (lists of asset records sharing the same content) into the project. Groups
+        are read from the iterable only as parser slots free up.
+        `on_assets_ingested(asset_records, inserted_chunks)` is awaited once a group is fully searchable.
+        Returns the number of inserted chunks and ingested files; raises RuntimeError when a stage fails.
+        """
+        chunks_queue = asyncio.Queue(maxsize=queue_size)
+        persisted_queue = asyncio.Queue(maxsize=queue_size)
+        embedded_queue = asyncio.Queue(maxsize=queue_size)
+        parser_slots = asyncio.Semaphore(max_parsers)
+
+        totals = {"inserted_chunks": 0, "ingested_files": 0}
+
+        async def parse_group(asset_records: list):
+            file_id = asset_records[0].asset_name
+            chunks_count = 0
+            try:
+                file_content = self.process_controller.get_file_content_iterator(file_id=file_id)
+                if file_content is None:
+                    await chunks_queue.put(IngestionMarker(asset_records=asset_records, is_failed=True))
+                    return
+
+                async for file_chunks in self.process_controller.stream_file_chunks(
+                        file_content=file_content,
+                        chunk_size=chunk_size,
+                        overlap_size=overlap_size,
+                        batch_size=batch_size
+                ):
+                    await chunks_queue.put(IngestionBatch(
+                        asset_records=asset_records,
+                        chunks=file_chunks,
+                        chunk_order_offset=chunks_count
+                    ))
+                    chunks_count += len(file_chunks)
+            except Exception as e:
+                # a broken file fails on its own; the batches it already sent are rolled back by index_stage
+                self.logger.error(f"Error while parsing file: {file_id}: {e}")
+                await chunks_queue.put(IngestionMarker(asset_records=asset_records, chunks_count=chunks_count,
+                                                       is_failed=True))
+                return
+
+            await chunks_queue.put(IngestionMarker(asset_records=asset_records, chunks_count=chunks_count))
+
+        async def parse_stage():
+            parse_tasks = set()
+            try:
+                async for asset_records in asset_groups:
+                    await parser_slots.acquire()
+                    parse_task = asyncio.create_task(parse_group(asset_records))
+                    parse_task.add_done_callback(lambda _: parser_slots.release())
+                    parse_task.add_done_callback(parse_tasks.discard)
+                    parse_tasks.add(parse_task)
+
+                await asyncio.gather(*parse_tasks)
+            finally:
+                for parse_task in parse_tasks:
+                    parse_task.cancel()
+            await chunks_queue.put(None)
+
+        async def persist_stage():
+            while (item := await chunks_queue.get()) is not None:
+                if isinstance(item, IngestionBatch):
+                    chunks_records = [
+                        {
+                            "chunk_text": chunk.page_content,
+                            "chunk_metadata": chunk.metadata,
+                            "chunk_order": item.chunk_order_offset + i + 1,
+                            "chunk_project_id": project.project_id,
+                            "chunk_asset_id": record.asset_id
+                        }
+                        for record in item.asset_records
+                        for i, chunk in enumerate(item.chunks)
+                    ]
+
+                    item.chunks_ids = await self.chunk_model.bulk_insert_chunks(chunks=chunks_records)
+                    item.texts = [c["chunk_text"] for c in chunks_records]
+                    item.metadata = [c["chunk_metadata"] for c in chunks_records]
+                    item.chunks = []
+
+                await persisted_queue.put(item)
+            await persisted_queue.put(None)
+
+        async def embed_stage():
+            while (item := await persisted_queue.get()) is not None:
+                if isinstance(item, IngestionBatch):
+                    item.vectors = await self.nlp_controller.embed_documents(texts=item.texts)
+                    if item.vectors is None:
+                        raise RuntimeError(f"Error while embedding chunks of file: {item.asset_records[0].asset_name}")
+
+                await embedded_queue.put(item)
+            await embedded_queue.put(None)
+
+        async def index_stage():
+            while (item := await embedded_queue.get()) is not None:
+                if isinstance(item, IngestionBatch):
+                    is_inserted = await self.nlp_controller.insert_into_vector_db(
+                        project=project,
+                        texts=item.texts,
+                        metadata=item.metadata,
+                        vectors=item.vectors,
+                        chunks_ids=item.chunks_ids
+                    )
+                    if not is_inserted:
+                        raise RuntimeError(f"Error while indexing chunks of file: {item.asset_records[0].asset_name}")
+
+                    totals["inserted_chunks"] += len(item.chunks_ids)
+                    continue
+
+                file_id = item.asset_records[0].asset_name
+                if item.is_failed:
+                    self.logger.error(f"Error while processing file: {file_id}")
+                    if item.chunks_count > 0:
+                        totals["inserted_chunks"] -= await self.remove_assets_chunks(
+                            project=project, asset_records=item.asset_records)
+                    continue
+
+                if item.chunks_count == 0:
+                    raise RuntimeError(f"No chunks produced for file: {file_id}")
+
+                totals["ingested_files"] += len(item.asset_records)
+                if on_assets_ingested is not None:
+                    await on_assets_ingested(item.asset_records, item.chunks_count * len(item.asset_records))
+
+        _ = await self.nlp_controller.create_vector_db_collection(project=project)
+
+        stages = []
+        try:
+            # inserted rows are searchable right away; the vector index is built once at the end
+            _ = await self.nlp_controller.start_vector_db_bulk_load(project=project)
+
+            stages = [
+                asyncio.create_task(stage())
+                for stage in (parse_stage, persist_stage, embed_stage, index_stage)
+            ]
+
+            done, _ = await asyncio.wait(stages, return_when=asyncio.FIRST_EXCEPTION)
+            for stage in done:
+                stage.result()
+        finally:
+            for stage in stages:
+                stage.cancel()
+            _ = await self.nlp_controller.finish_vector_db_bulk_load(project=project)
+
+        return totals["inserted_chunks"], totals["ingested_files"]
+
+    async def remove_assets_chunks(self, project: Project, asset_records: list):
+        """Delete the chunks and vectors of partially ingested assets; returns the removed chunks count."""
+        removed_chunks_count = 0
+        for asset_record in asset_records:
+            chunks_ids = await self.chunk_model.get_asset_chunks_ids(asset_id=asset_record.asset_id)
+            if not chunks_ids:
+                continue
+
+            _ = await self.nlp_controller.delete_from_vector_db(project=project, chunks_ids=chunks_ids)
+            removed_chunks_count += await self.chunk_model.delete_chunks_by_asset_id(asset_id=asset_record.asset_id)
+
+        return removed_chunks_count
@@ -8,21 +8,41 @@ import json
 class NLPController(BaseController):
 
     def __init__(self, vectordb_client, generation_client,
-                 embedding_client, template_parser):
+                 embedding_client, template_parser, embedding_cache=None,
+                 embedding_batcher=None, query_coalescer=None, answer_cache=None,
+                 token_counter=None, context_max_tokens: int = None):
         super().__init__()
 
         self.vectordb_client = vectordb_client
         self.generation_client = generation_client
         self.embedding_client = embedding_client
         self.template_parser = template_parser
+        self.embedding_cache = embedding_cache
+        self.embedding_batcher = embedding_batcher
+        self.query_coalescer = query_coalescer
+        self.answer_cache = answer_cache
+        self.token_counter = token_counter
+        self.context_max_tokens = context_max_tokens
 
     def create_collection_name(self, project_id: str):
         return f"collection_{self.vectordb_client.default_vector_size}_{project_id}".strip()
 
+    async def invalidate_cached_answers(self, project: Project):
+        # cached answers were built from the previous collection content
+        if self.answer_cache is not None:
+            await self.answer_cache.invalidate_project(project_id=project.project_id)
+
     async def reset_vector_db_collection(self, project: Project):
+        await self.invalidate_cached_answers(project=project)
         collection_name = self.create_collection_name(project_id=project.project_id)
         return await self.vectordb_client.delete_collection(collection_name=collection_name)
 
+    async def delete_from_vector_db(self, project: Project, chunks_ids: List[int]):
+        # callers invalidate cached answers once for all their deletes (see `invalidate_cached_answers`)
+        collection_name = self.create_collection_name(project_id=project.project_id)
+        return await self.vectordb_client.delete_by_record_ids(collection_name=collection_name,
+                                                               record_ids=chunks_ids)
+
     async def get_vector_db_collection_info(self, project: Project):
         collection_name = self.create_collection_name(project_id=project.project_id)
         collection_info = await self.vectordb_client.get_collection_info(collection_name=collection_name)
@@ -31,28 +51,58 @@ class NLPController(BaseController):
             json.dumps(collection_info, default=lambda x: x.__dict__)
         )
 
-    async def index_into_vector_db(self, project: Project, chunks: List[DataChunk],
-                                   chunks_ids: List[int],
-                                   do_reset: bool = False):
+    async def embed_texts(self, texts: List[str], document_type: str):
+        # identical texts (e.g. the same file stored under several assets) are embedded once
+        unique_texts = list(dict.fromkeys(texts))
 
-        # step1: get collection name
-        collection_name = self.create_collection_name(project_id=project.project_id)
+        if self.embedding_cache is not None:
+            unique_vectors = await self.embedding_cache.get_many(texts=unique_texts, document_type=document_type)
+        else:
+            unique_vectors = [None] * len(unique_texts)
 
-        # step2: manage items
-        texts = [c.chunk_text for c in chunks]
-        metadata = [c.chunk_metadata for c in chunks]
-        vectors = self.embedding_client.embed_text(text=texts,
-                                                   document_type=DocumentTypeEnum.DOCUMENT.value)
+        missing_texts = [t for t, v in zip(unique_texts, unique_vectors) if v is None]
+        if missing_texts:
+            # queries are coalesced with concurrent requests; the batcher splits by provider limits and
+            # retries rate limits; fall back to one direct call
+            if document_type == DocumentTypeEnum.QUERY.value and self.query_coalescer is not None:
+                embedder = self.query_coalescer
+            elif self.embedding_batcher is not None:
+                embedder = self.embedding_batcher
+            else:
+                embedder = self.embedding_client
+            missing_vectors = await embedder.embed_text(text=missing_texts, document_type=document_type)
+
+            if not missing_vectors or len(missing_vectors) != len(missing_texts):
+                return None
+
+            if self.embedding_cache is not None:
+                await self.embedding_cache.set_many(texts=missing_texts, vectors=missing_vectors,
+                                                    document_type=document_type)
+
+            missing_vectors = iter(missing_vectors)
+            unique_vectors = [v if v is not None else next(missing_vectors) for v in unique_vectors]
+
+        vectors_by_text = dict(zip(unique_texts, unique_vectors))
+        return [vectors_by_text[t] for t in texts]
+
+    async def embed_documents(self, texts: List[str]):
+        return await self.embed_texts(texts=texts, document_type=DocumentTypeEnum.DOCUMENT.value)
 
-        # step3: create collection if not exists
-        _ = await self.vectordb_client.create_collection(
+    async def create_vector_db_collection(self, project: Project, do_reset: bool = False):
+        if do_reset:
+            await self.invalidate_cached_answers(project=project)
+
+        collection_name = self.create_collection_name(project_id=project.project_id)
+        return await self.vectordb_client.create_collection(
             collection_name=collection_name,
             embedding_size=self.embedding_client.embedding_size,
             do_reset=do_reset,
         )
 
-        # step4: insert into vector db
-        _ = await self.vectordb_client.insert_many(
+    async def insert_into_vector_db(self, project: Project, texts: List[str], metadata: List[dict],
+                                    vectors: List[list], chunks_ids: List[int]):
+        collection_name = self.create_collection_name(project_id=project.project_id)
+        return await self.vectordb_client.insert_many(
             collection_name=collection_name,
             texts=texts,
             metadata=metadata,
@@ -60,32 +110,61 @@ class NLPController(BaseController):
             record_ids=chunks_ids,
         )
 
-        return True
+    async def start_vector_db_bulk_load(self, project: Project, drop_index: bool = False):
+        collection_name = self.create_collection_name(project_id=project.project_id)
+        return await self.vectordb_client.start_bulk_load(collection_name=collection_name,
+                                                          drop_index=drop_index)
 
-    async def search_vector_db_collection(self, project: Project, text: str, limit: int = 10):
+    async def finish_vector_db_bulk_load(self, project: Project):
+        # one index version bump per load rather than one `projects` row update per inserted page
+        await self.invalidate_cached_answers(project=project)
+        collection_name = self.create_collection_name(project_id=project.project_id)
+        return await self.vectordb_client.finish_bulk_load(collection_name=collection_name)
 
-        # step1: get collection name
-        query_vector = None
+    async def rebuild_vector_db_index(self, project: Project, index_type: str = None):
         collection_name = self.create_collection_name(project_id=project.project_id)
+        return await self.vectordb_client.reset_vector_index(collection_name=collection_name,
+                                                             index_type=index_type)
+
+    async def index_into_vector_db(self, project: Project, chunks: List[DataChunk],
+                                   chunks_ids: List[int]):
+        """Embed and insert one page of chunks; the caller creates the collection once per push."""
 
-        # step2: get text embedding vector
-        vectors = self.embedding_client.embed_text(text=text,
-                                                   document_type=DocumentTypeEnum.QUERY.value)
+        # step1: manage items
+        texts = [c.chunk_text for c in chunks]
+        metadata = [c.chunk_metadata for c in chunks]
 
-        if not vectors or len(vectors) == 0:
+        vectors = await self.embed_documents(texts=texts)
+        if vectors is None:
             return False
 
-        if isinstance(vectors, list) and len(vectors) > 0:
-            query_vector = vectors[0]
+        # step2: insert into vector db
+        return await self.insert_into_vector_db(
+            project=project,
+            texts=texts,
+            metadata=metadata,
+            vectors=vectors,
+            chunks_ids=chunks_ids,
+        )
 
-        if not query_vector:
-            return False
+    async def embed_query(self, text: str):
+        vectors = await self.embed_texts(texts=[text], document_type=DocumentTypeEnum.QUERY.value)
+
+        if not vectors or len(vectors) == 0 or not vectors[0]:
+            return None
+
+        return vectors[0]
+
+    async def search_vector_db_collection_by_vector(self, project: Project, query_vector: list, limit: int = 10,
+                                                    ef_search: int = None, probes: int = None):
+        collection_name = self.create_collection_name(project_id=project.project_id)
 
-            # step3: do semantic search
         results = await self.vectordb_client.search_by_vector(
             collection_name=collection_name,
             vector=query_vector,
-            limit=limit
+            limit=limit,
+            ef_search=ef_search,
+            probes=probes
         )
 
         if not results:
@@ -93,36 +172,134 @@ class NLPController(BaseController):
 
         return results
 
-    async def answer_rag_question(self, project: Project, query: str, limit: int = 10):
+    async def search_vector_db_collection(self, project: Project, text: str, limit: int = 10,
+                                          ef_search: int = None, probes: int = None):
 
-        answer, full_prompt, chat_history = None, None, None
+        # step1: get text embedding vector
+        query_vector = await self.embed_query(text=text)
+        if not query_vector:
+            return False
 
-        # step1: retrieve related documents
-        retrieved_documents = await self.search_vector_db_collection(
+        # step2: do semantic search
+        return await self.search_vector_db_collection_by_vector(
             project=project,
-            text=query,
+            query_vector=query_vector,
             limit=limit,
+            ef_search=ef_search,
+            probes=probes
         )
 
-        if not retrieved_documents or len(retrieved_documents) == 0:
-            return answer, full_prompt, chat_history
+    async def explain_vector_db_search(self, project: Project, text: str, limit: int = 10,
+                                       ef_search: int = None, probes: int = None):
+        # only pgvector exposes query plans
+        if not hasattr(self.vectordb_client, "explain_search"):
+            return None
 
-        # step2: Construct LLM prompt
-        system_prompt = self.template_parser.get("rag", "system_prompt")
+        query_vector = await self.embed_query(text=text)
+        if not query_vector:
+            return None
 
-        documents_prompts = "\n".join([
+        collection_name = self.create_collection_name(project_id=project.project_id)
+        return await self.vectordb_client.explain_search(
+            collection_name=collection_name,
+            vector=query_vector,
+            limit=limit,
+            ef_search=ef_search,
+            probes=probes
+        )
+
+    async def evaluate_search_recall(self, project: Project, queries: List[str], limit: int = 10,
+                                     ef_search: int = None, probes: int = None):
+        """
+        Recall@limit of the regular (indexed, possibly quantized) search against an exact search
+        over the same collection, averaged over `queries`.
+        """
+        collection_name = self.create_collection_name(project_id=project.project_id)
+        query_vectors = await self.embed_texts(texts=queries, document_type=DocumentTypeEnum.QUERY.value)
+        if not query_vectors:
+            return None
+
+        recalls = []
+        for query_vector in query_vectors:
+            approximate_results = await self.vectordb_client.search_by_vector(
+                collection_name=collection_name, vector=query_vector, limit=limit,
+                ef_search=ef_search, probes=probes
+            ) or []
+            exact_results = await self.vectordb_client.search_by_vector(
+                collection_name=collection_name, vector=query_vector, limit=limit, exact=True
+            ) or []
+
+            if not exact_results:
+                continue
+
+            exact_texts = {doc.text for doc in exact_results}
+            found_count = sum(doc.text in exact_texts for doc in approximate_results)
+            recalls.append(found_count / len(exact_texts))
+
+        if not recalls:
+            return None
+
+        return {
+            "queries_count": len(recalls),
+            "limit": limit,
+            "recall": round(sum(recalls) / len(recalls), 4),
+            "min_recall": round(min(recalls), 4),
+        }
+
+    def pack_rag_documents(self, retrieved_documents: list, max_tokens: int):
+        """
+        Return the texts of the best-ranked documents that fit in `max_tokens`, including the
+        document template. Documents that do not fit are skipped; the first one is truncated instead.
+        """
+        document_overhead = self.token_counter.count(
             self.template_parser.get("rag", "document_prompt", {
-                "doc_num": idx + 1,
-                "chunk_text": self.generation_client.process_text(doc.text),
+                "doc_num": len(retrieved_documents),
+                "chunk_text": "",
             })
-            for idx, doc in enumerate(retrieved_documents)
-        ])
+        ) + 1
+
+        packed_texts, used_tokens = [], 0
+        for doc in retrieved_documents:
+            remaining_tokens = max_tokens - used_tokens - document_overhead
+            if remaining_tokens <= 0:
+                break
+
+            text_tokens = self.token_counter.count(doc.text)
+            if text_tokens > remaining_tokens:
+                if not packed_texts:
+                    packed_texts.append(self.token_counter.truncate(doc.text, remaining_tokens))
+                    used_tokens += remaining_tokens + document_overhead
+                continue
+
+            packed_texts.append(doc.text)
+            used_tokens += text_tokens + document_overhead
+
+        return packed_texts
+
+    def construct_rag_prompt(self, query: str, retrieved_documents: list):
+        system_prompt = self.template_parser.get("rag", "system_prompt")
 
         footer_prompt = self.template_parser.get("rag", "footer_prompt", {
             "query": query
         })
 
-        # step3: Construct Generation Client Prompts
+        if self.token_counter is not None and self.context_max_tokens:
+            # documents get whatever the token budget leaves after the system and footer prompts
+            documents_budget = self.context_max_tokens - self.token_counter.count(system_prompt) \
+                               - self.token_counter.count(footer_prompt)
+            chunks_texts = self.pack_rag_documents(retrieved_documents=retrieved_documents,
+                                                   max_tokens=documents_budget)
+        else:
+            chunks_texts = [self.generation_client.process_text(doc.text) for doc in retrieved_documents]
+
+        documents_prompts = "\n".join([
+            self.template_parser.get("rag", "document_prompt", {
+                "doc_num": idx + 1,
+                "chunk_text": chunk_text,
+            })
+            for idx, chunk_text in enumerate(chunks_texts)
+        ])
+
         chat_history = [
             self.generation_client.construct_prompt(
                 prompt=system_prompt,
@@ -132,11 +309,110 @@ class NLPController(BaseController):
 
         full_prompt = "\n\n".join([documents_prompts, footer_prompt])
 
+        return full_prompt, chat_history
+
+    async def answer_rag_question(self, project: Project, query: str, limit: int = 10):
+
+        answer, full_prompt, chat_history = None, None, None
+
+        # step1: embed the question and look for a near-duplicate answered before
+        query_vector = await self.embed_query(text=query)
+        if not query_vector:
+            return answer, full_prompt, chat_history
+
+        if self.answer_cache is not None:
+            cached = self.answer_cache.get_similar(project_id=project.project_id,
+                                                   index_version=project.project_index_version,
+                                                   query_vector=query_vector, limit=limit)
+            if cached is not None:
+                return cached.answer, cached.full_prompt, cached.chat_history
+
+        # step2: retrieve related documents
+        retrieved_documents = await self.search_vector_db_collection_by_vector(
+            project=project,
+            query_vector=query_vector,
+            limit=limit,
+        )
+
+        if not retrieved_documents or len(retrieved_documents) == 0:
+            return answer, full_prompt, chat_history
+
+        # step3: Construct LLM prompt and Generation Client Prompts
+        full_prompt, chat_history = self.construct_rag_prompt(query=query,
+                                                              retrieved_documents=retrieved_documents)
+
+        if self.answer_cache is not None:
+            cached = self.answer_cache.get_exact(project_id=project.project_id,
+                                                 index_version=project.project_index_version,
+                                                 full_prompt=full_prompt)
+            if cached is not None:
+                return cached.answer, cached.full_prompt, cached.chat_history
+
         # step4: Retrieve the Answer
-        answer = self.generation_client.generate_text(
+        answer = await self.generation_client.generate_text(
             prompt=full_prompt,
             chat_history=chat_history
         )
 
+        if answer and self.answer_cache is not None:
+            self.answer_cache.set(project_id=project.project_id, index_version=project.project_index_version,
+                                  query_vector=query_vector, limit=limit,
+                                  answer=answer, full_prompt=full_prompt, chat_history=chat_history,
+                                  retrieved_documents=retrieved_documents)
+
         return answer, full_prompt, chat_history
 
+    async def answer_rag_question_stream(self, project: Project, query: str, limit: int = 10):
+        """
+        Streaming variant of `answer_rag_question`: returns the retrieved documents, an async
+        iterator over the answer text deltas, the full prompt and the chat history.
+        A cached answer is replayed as a single delta.
+        """
+        query_vector = await self.embed_query(text=query)
+        if not query_vector:
+            return None, None, None, None
+
+        cached = None
+        if self.answer_cache is not None:
+            cached = self.answer_cache.get_similar(project_id=project.project_id,
+                                                   index_version=project.project_index_version,
+                                                   query_vector=query_vector, limit=limit)
+
+        if cached is None:
+            retrieved_documents = await self.search_vector_db_collection_by_vector(
+                project=project,
+                query_vector=query_vector,
+                limit=limit,
+            )
+
+            if not retrieved_documents or len(retrieved_documents) == 0:
+                return None, None, None, None
+
+            full_prompt, chat_history = self.construct_rag_prompt(query=query,
+                                                                  retrieved_documents=retrieved_documents)
+
+            if self.answer_cache is not None:
+                cached = self.answer_cache.get_exact(project_id=project.project_id,
+                                                     index_version=project.project_index_version,
+                                                     full_prompt=full_prompt)
+
+        if cached is not None:
+            async def replay_cached_answer():
+                yield cached.answer
+
+            return cached.retrieved_documents, replay_cached_answer(), cached.full_prompt, cached.chat_history
+
+        async def stream_answer():
+            answer_parts = []
+            async for text in self.generation_client.generate_text_stream(prompt=full_prompt,
+                                                                          chat_history=chat_history):
+                answer_parts.append(text)
+                yield text
+
+            if answer_parts and self.answer_cache is not None:
+                self.answer_cache.set(project_id=project.project_id, index_version=project.project_index_version,
+                                      query_vector=query_vector, limit=limit,
+                                      answer="".join(answer_parts), full_prompt=full_prompt,
+                                      chat_history=chat_history, retrieved_documents=retrieved_documents)
+
+        return retrieved_documents, stream_answer(), full_prompt, chat_history
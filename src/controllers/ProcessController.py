@@ -1,9 +1,13 @@
+import asyncio
+import itertools
 import os
+from datetime import datetime, timezone
 
 from langchain_community.document_loaders import PyMuPDFLoader
 from langchain_community.document_loaders import TextLoader
 from models import ProcessingEnum
-from typing import List, Optional
+from models.enums.AssetConfigEnum import AssetConfigEnum
+from typing import AsyncIterator, Iterable, Iterator, List, Optional
 from langchain.docstore.document import Document
 from dataclasses import dataclass
 from .BaseController import BaseController
@@ -23,6 +27,58 @@ class ProcessController(BaseController):
         self.project_id = project_id
         self.project_path = ProjectController().get_project_path(project_id=project_id)
 
+    async def process_file_in_pool(self, executor, file_id: str, chunk_size: int = 100,
+                                   overlap_size: int = 20, timeout: float = None,
+                                   pool_slots: asyncio.Semaphore = None):
+        """
+        Load and chunk `file_id` inside `executor` without blocking the event loop.
+        Raises asyncio.TimeoutError when the file takes longer than `timeout` seconds.
+
+        `pool_slots` (sized to the pool) is acquired before submitting and only released once the worker
+        is done with the file, also after a timeout: the worker keeps parsing a timed out file, and the
+        next file must not be queued behind it with its timeout already running.
+        """
+        loop = asyncio.get_running_loop()
+
+        if pool_slots is not None:
+            await pool_slots.acquire()
+
+        def on_worker_done(done_future):
+            # a timed out file may still fail later; retrieve it so it is not reported as never retrieved
+            if not done_future.cancelled():
+                done_future.exception()
+            if pool_slots is not None:
+                pool_slots.release()
+
+        future = loop.run_in_executor(executor, process_file_worker, self.project_id, file_id,
+                                      chunk_size, overlap_size)
+        future.add_done_callback(on_worker_done)
+
+        # shielded: cancelling the wrapper on timeout would release the slot while the worker is still busy
+        return await asyncio.wait_for(asyncio.shield(future), timeout=timeout)
+
+    def build_processing_state(self, asset_hash: str, chunk_size: int, overlap_size: int,
+                               is_indexed: bool = False):
+        return {
+            AssetConfigEnum.CHUNK_SIZE.value: chunk_size,
+            AssetConfigEnum.OVERLAP_SIZE.value: overlap_size,
+            AssetConfigEnum.ASSET_HASH.value: asset_hash,
+            AssetConfigEnum.PROCESSED_AT.value: datetime.now(timezone.utc).isoformat(),
+            AssetConfigEnum.IS_INDEXED.value: is_indexed,
+        }
+
+    def is_processing_state_changed(self, asset_config: dict, asset_hash: str,
+                                    chunk_size: int, overlap_size: int):
+        processing_state = (asset_config or {}).get(AssetConfigEnum.PROCESSING.value)
+        if not processing_state:
+            return True
+
+        return (
+                processing_state.get(AssetConfigEnum.CHUNK_SIZE.value) != chunk_size
+                or processing_state.get(AssetConfigEnum.OVERLAP_SIZE.value) != overlap_size
+                or processing_state.get(AssetConfigEnum.ASSET_HASH.value) != asset_hash
+        )
+
     def get_file_extension(self, file_id: str):
         return os.path.splitext(file_id)[-1]
 
@@ -53,6 +109,15 @@ class ProcessController(BaseController):
 
         return None
 
+    def get_file_content_iterator(self, file_id: str):
+        """Lazy variant of `get_file_content`: pages are loaded one at a time."""
+
+        loader = self.get_file_loader(file_id=file_id)
+        if loader:
+            return loader.lazy_load()
+
+        return None
+
 
     def process_file_content(self, file_content: list, file_id: str,
                              chunk_size: int = 100, overlap_size: int = 20):
@@ -76,6 +141,7 @@ class ProcessController(BaseController):
             texts=file_content_texts,
             metadatas=file_content_metadata,
             chunk_size=chunk_size,
+            overlap_size=overlap_size,
         )
 
         return chunks
@@ -115,6 +181,7 @@ class ProcessController(BaseController):
             texts: List[str],
             metadatas: Optional[List[dict]],
             chunk_size: int,
+            overlap_size: int = 0,
             splitter_tag: str = "\n",
             keep_separator: bool = True,
     ) -> List[Document]:
@@ -123,34 +190,63 @@ class ProcessController(BaseController):
         and preserve per-text metadata.
 
         Notes:
-          - `chunk_size` is in characters.
+          - `chunk_size` and `overlap_size` are in characters.
           - Long pieces are further sliced to respect the limit.
+          - Each chunk after the first of a text starts with the last `overlap_size` characters of the
+            previous one.
         """
 
         if chunk_size <= 0:
             raise ValueError("chunk_size must be > 0")
 
+        if overlap_size < 0 or overlap_size >= chunk_size:
+            raise ValueError("overlap_size must be >= 0 and < chunk_size")
+
         if metadatas is not None and len(metadatas) != len(texts):
             raise ValueError("texts and metadatas must have the same length")
 
-        chunks: List[Document] = []
+        return list(self.iter_simpler_splitter(
+            texts=texts,
+            metadatas=metadatas,
+            chunk_size=chunk_size,
+            overlap_size=overlap_size,
+            splitter_tag=splitter_tag,
+            keep_separator=keep_separator,
+        ))
 
-        def flush_chunk(buf: List[str], meta: dict):
-            if not buf:
-                return
-            content = "".join(buf)
-            if content:  # prevent empty trailing chunk
-                chunks.append(Document(page_content=content, metadata=meta or {}))
+    def iter_simpler_splitter(
+            self,
+            texts: Iterable[str],
+            metadatas: Optional[Iterable[dict]],
+            chunk_size: int,
+            overlap_size: int = 0,
+            splitter_tag: str = "\n",
+            keep_separator: bool = True,
+    ) -> Iterator[Document]:
+        """
+        Generator version of `process_simpler_splitter`: chunks are yielded as soon as they are packed,
+        so neither the inputs nor the outputs have to be held in memory.
+        """
+
+        if chunk_size <= 0:
+            raise ValueError("chunk_size must be > 0")
+
+        if overlap_size < 0 or overlap_size >= chunk_size:
+            raise ValueError("overlap_size must be >= 0 and < chunk_size")
 
-        for idx, text in enumerate(texts):
-            meta = (metadatas[idx] if metadatas is not None else {}) or {}
+        metadatas = itertools.repeat(None) if metadatas is None else metadatas
+
+        for text, meta in zip(texts, metadatas):
+            meta = meta or {}
 
             # Split this text only (preserves per-source metadata)
             raw_pieces = text.split(splitter_tag) if splitter_tag else [text]
-            pieces = [p.strip() for p in raw_pieces if p.strip() != ""]  # keep single chars
+            pieces = (p.strip() for p in raw_pieces if p.strip() != "")  # keep single chars
 
             buf: List[str] = []
             buf_len = 0
+            # characters packed since the last flush; the carried-over overlap alone is not a chunk
+            new_len = 0
             sep = splitter_tag if (keep_separator and splitter_tag) else ""
 
             for piece in pieces:
@@ -166,19 +262,75 @@ class ProcessController(BaseController):
 
                     if take == 0:
                         # buffer full; flush and continue
-                        flush_chunk(buf, meta)
-                        buf, buf_len = [], 0
+                        if buf:
+                            yield Document(page_content="".join(buf), metadata=meta)
+                        buf, buf_len, new_len = [], 0, 0
                         continue
 
                     buf.append(unit[start:start + take])
                     buf_len += take
+                    new_len += take
                     start += take
 
                     if buf_len >= chunk_size:
-                        flush_chunk(buf, meta)
-                        buf, buf_len = [], 0
+                        content = "".join(buf)
+                        yield Document(page_content=content, metadata=meta)
 
-            # Flush any remainder for this text
-            flush_chunk(buf, meta)
+                        # the next chunk starts with the tail of this one
+                        overlap = content[len(content) - overlap_size:] if overlap_size > 0 else ""
+                        buf, buf_len, new_len = ([overlap] if overlap else []), len(overlap), 0
 
-        return chunks
+            # Flush any remainder for this text (prevent empty or overlap-only trailing chunk)
+            content = "".join(buf)
+            if new_len > 0 and content[len(content) - new_len:].strip():
+                yield Document(page_content=content, metadata=meta)
+
+    def iter_file_chunks(self, file_content: Iterable, chunk_size: int = 100,
+                         overlap_size: int = 20) -> Iterator[Document]:
+        """Streaming counterpart of `process_file_content`, fed by `get_file_content_iterator`."""
+
+        for page in file_content:
+            yield from self.iter_simpler_splitter(
+                texts=[page.page_content],
+                metadatas=[page.metadata],
+                chunk_size=chunk_size,
+                overlap_size=overlap_size,
+            )
+
+    async def stream_file_chunks(self, file_content: Iterable, chunk_size: int = 100,
+                                 overlap_size: int = 20, batch_size: int = 500) -> AsyncIterator[List[Document]]:
+        """
+        Yield chunks of a lazily loaded file in batches of at most `batch_size`.
+        Loading and splitting run on the default thread pool, one batch at a time, so memory stays bounded.
+        """
+        loop = asyncio.get_running_loop()
+        chunks_iterator = self.iter_file_chunks(
+            file_content=file_content,
+            chunk_size=chunk_size,
+            overlap_size=overlap_size
+        )
+
+        while True:
+            batch = await loop.run_in_executor(None, list, itertools.islice(chunks_iterator, batch_size))
+            if not batch:
+                break
+            yield batch
+
+
+def process_file_worker(project_id: int, file_id: str, chunk_size: int, overlap_size: int):
+    """
+    Processing pool entry point: it has to live at module level so it can be pickled.
+    Returns None when the file can not be loaded, otherwise the list of chunks.
+    """
+    process_controller = ProcessController(project_id=project_id)
+
+    file_content = process_controller.get_file_content(file_id=file_id)
+    if file_content is None:
+        return None
+
+    return process_controller.process_file_content(
+        file_content=file_content,
+        file_id=file_id,
+        chunk_size=chunk_size,
+        overlap_size=overlap_size
+    )
@@ -1,4 +1,5 @@
 from .DataController import DataController
+from .IngestionController import IngestionController
 from .NLPController import NLPController
 from .ProcessController import ProcessController
 from .ProjectController import ProjectController
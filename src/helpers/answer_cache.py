@@ -0,0 +1,168 @@
+import hashlib
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+import numpy as np
+
+from models.ProjectModel import ProjectModel
+
+
+@dataclass
+class AnswerCacheEntry:
+    query_unit_vector: np.ndarray
+    limit: int
+    answer: str
+    full_prompt: str
+    chat_history: list
+    retrieved_documents: list
+    created_at: float
+
+
+@dataclass
+class ProjectAnswers:
+    index_version: int
+    entries: OrderedDict = field(default_factory=OrderedDict)
+    # unit query vectors of `entries`, one row per prompt hash of `matrix_hashes`; rebuilt lazily after changes
+    matrix: Optional[np.ndarray] = None
+    matrix_hashes: list = field(default_factory=list)
+
+
+class AnswerCache:
+    """
+    Per-project cache of RAG answers with two lookup tiers.
+
+    The exact tier is keyed by sha256 of the full prompt (retrieved context + question), so it only
+    saves the generation. The semantic tier compares the query embedding against the cached questions
+    of the same project with one matrix product and, above `similarity_threshold` cosine similarity,
+    saves retrieval too. Entries expire after `ttl_seconds`.
+
+    Entries belong to the project's `project_index_version`, a counter in Postgres bumped whenever the
+    project's vector collection changes. Every worker drops its entries of older versions on the next
+    lookup, so answers are not served from a collection re-indexed by another worker.
+    """
+
+    def __init__(self, db_client=None, max_entries_per_project: int = 256, similarity_threshold: float = 0.95,
+                 ttl_seconds: int = 3600):
+        self.project_model = ProjectModel(db_client=db_client) if db_client is not None else None
+        self.max_entries_per_project = max_entries_per_project
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_seconds
+
+        self.projects = {}
+        self.stats = {"exact_hits": 0, "semantic_hits": 0, "misses": 0}
+
+        self.logger = logging.getLogger("uvicorn.error")
+
+    @staticmethod
+    def hash_prompt(full_prompt: str):
+        return hashlib.sha256(full_prompt.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def unit_vector(vector: List[float]):
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else None
+
+    def _is_expired(self, entry: AnswerCacheEntry):
+        return self.ttl_seconds > 0 and time.monotonic() - entry.created_at > self.ttl_seconds
+
+    def _get_project(self, project_id: int, index_version: int):
+        project_answers = self.projects.get(project_id)
+        if project_answers is not None and project_answers.index_version != index_version:
+            # the collection changed since these answers were cached
+            del self.projects[project_id]
+            return None
+        return project_answers
+
+    def get_exact(self, project_id: int, index_version: int, full_prompt: str):
+        project_answers = self._get_project(project_id=project_id, index_version=index_version)
+        prompt_hash = self.hash_prompt(full_prompt)
+
+        entry = project_answers.entries.get(prompt_hash) if project_answers else None
+        if entry is None or self._is_expired(entry):
+            self.stats["misses"] += 1
+            return None
+
+        project_answers.entries.move_to_end(prompt_hash)
+        self.stats["exact_hits"] += 1
+        return entry
+
+    def get_similar(self, project_id: int, index_version: int, query_vector: List[float], limit: int):
+        """Return the most similar cached question of the project above the threshold, if any."""
+        project_answers = self._get_project(project_id=project_id, index_version=index_version)
+        query_unit_vector = self.unit_vector(query_vector)
+        if not project_answers or not project_answers.entries or query_unit_vector is None:
+            return None
+
+        if project_answers.matrix is None:
+            project_answers.matrix_hashes = list(project_answers.entries.keys())
+            project_answers.matrix = np.stack([
+                project_answers.entries[prompt_hash].query_unit_vector
+                for prompt_hash in project_answers.matrix_hashes
+            ])
+
+        similarities = project_answers.matrix @ query_unit_vector
+        for i in np.argsort(-similarities):
+            if similarities[i] < self.similarity_threshold:
+                break
+
+            prompt_hash = project_answers.matrix_hashes[i]
+            entry = project_answers.entries[prompt_hash]
+            if entry.limit != limit or self._is_expired(entry):
+                continue
+
+            project_answers.entries.move_to_end(prompt_hash)
+            self.stats["semantic_hits"] += 1
+            return entry
+
+        return None
+
+    def set(self, project_id: int, index_version: int, query_vector: List[float], limit: int, answer: str,
+            full_prompt: str, chat_history: list, retrieved_documents: list):
+        query_unit_vector = self.unit_vector(query_vector)
+        if self.max_entries_per_project <= 0 or query_unit_vector is None:
+            return
+
+        project_answers = self._get_project(project_id=project_id, index_version=index_version)
+        if project_answers is None:
+            project_answers = self.projects[project_id] = ProjectAnswers(index_version=index_version)
+
+        prompt_hash = self.hash_prompt(full_prompt)
+        project_answers.entries[prompt_hash] = AnswerCacheEntry(
+            query_unit_vector=query_unit_vector,
+            limit=limit,
+            answer=answer,
+            full_prompt=full_prompt,
+            chat_history=chat_history,
+            retrieved_documents=retrieved_documents,
+            created_at=time.monotonic(),
+        )
+        project_answers.entries.move_to_end(prompt_hash)
+
+        while len(project_answers.entries) > self.max_entries_per_project:
+            project_answers.entries.popitem(last=False)
+
+        project_answers.matrix = None
+
+    async def invalidate_project(self, project_id: int):
+        """Drop the project's answers here and, through its index version, in every other worker."""
+        self.projects.pop(project_id, None)
+
+        if self.project_model is None:
+            return None
+
+        try:
+            return await self.project_model.bump_index_version(project_id=project_id)
+        except Exception as e:
+            self.logger.error(f"Error while bumping the index version of project {project_id}: {e}")
+            return None
+
+    def get_stats(self):
+        return {
+            **self.stats,
+            "cached_projects": len(self.projects),
+            "cached_answers": sum(len(p.entries) for p in self.projects.values()),
+        }
@@ -11,6 +11,14 @@ class Settings(BaseSettings):
     FILE_MAX_SIZE: int
     FILE_DEFAULT_CHUNK_SIZE: int
 
+    PROCESSING_MAX_WORKERS: int = 4
+    PROCESSING_FILE_TIMEOUT: int = 300
+    PROCESSING_STREAM_BATCH_SIZE: int = 500
+    PROCESSING_PIPELINE_QUEUE_SIZE: int = 4
+
+    JOBS_MAX_CONCURRENT: int = 2
+    JOBS_HEARTBEAT_SECONDS: int = 30
+
     POSTGRES_USERNAME: str
     POSTGRES_PASSWORD: str
     POSTGRES_HOST: str
@@ -24,9 +32,27 @@ class Settings(BaseSettings):
     EMBEDDING_MODEL_ID: str = None
     EMBEDDING_MODEL_SIZE: int = None
 
+    EMBEDDING_LOCAL_MODEL_PATH: str = "assets/models"
+    EMBEDDING_LOCAL_MAX_LENGTH: int = 256
+    EMBEDDING_LOCAL_BATCH_SIZE: int = 32
+    EMBEDDING_LOCAL_NUM_THREADS: int = 4
+    EMBEDDING_LOCAL_MAX_WORKERS: int = 2
+
+    EMBEDDING_CACHE_MAX_ENTRIES: int = 10000
+    EMBEDDING_CACHE_USE_DB: bool = True
+
+    EMBEDDING_BATCH_MAX_CONCURRENCY: int = 4
+    EMBEDDING_BATCH_MAX_RETRIES: int = 5
+    EMBEDDING_BATCH_BACKOFF_BASE: float = 1.0
+    EMBEDDING_BATCH_BACKOFF_MAX: float = 30.0
+    EMBEDDING_QUERY_COALESCE_WINDOW_MS: int = 5
+    EMBEDDING_QUERY_COALESCE_MAX_BATCH: int = 64
+    INDEX_PUSH_PAGE_SIZE: int = 1000
+
     INPUT_DEFAULT_MAX_SIZE: int = None
     GENERATION_DEFAULT_MAX_TOKENS: int = None
     GENERATION_DEFAULT_TEMPERATURE: float = None
+    GENERATION_CONTEXT_MAX_TOKENS: int = 3000
 
     EMBEDDING_API_KEY: str = None
     EMBEDDING_API_URL: str = None
@@ -34,11 +60,32 @@ class Settings(BaseSettings):
     GENERATION_API_KEY: str = None
     GENERATION_API_URL: str = None
 
+    LLM_HTTP2: bool = True
+    LLM_HTTP_TIMEOUT: float = 60.0
+    LLM_HTTP_MAX_CONNECTIONS: int = 100
+    LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    LLM_HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    LLM_RATE_LIMIT_RPM: int = 0
+    LLM_RATE_LIMIT_TPM: int = 0
+
+    FAKE_LLM_LATENCY_MS: int = 0
+    FAKE_LLM_JITTER_MS: int = 0
+    FAKE_LLM_ERROR_RATE: float = 0.0
+
+    ANSWER_CACHE_MAX_ENTRIES: int = 256
+    ANSWER_CACHE_SIMILARITY_THRESHOLD: float = 0.95
+    ANSWER_CACHE_TTL_SECONDS: int = 3600
+
     VECTOR_DB_BACKEND_LITERAL:List[str] = None
     VECTOR_DB_BACKEND: str
     VECTOR_DB_PATH: str
     VECTOR_DB_DISTANCE_METHOD: str = None
     VECTOR_DB_PGVEC_INDEX_THRESHOLD:int = 100
+    VECTOR_DB_PGVEC_INDEX_TYPE: str = "hnsw"
+    VECTOR_DB_PGVEC_MAINTENANCE_WORK_MEM: str = "512MB"
+    VECTOR_DB_PGVEC_METADATA_CACHE_TTL_SECONDS: int = 60
+    VECTOR_DB_QUANTIZATION: str = "none"
+    VECTOR_DB_QUANTIZATION_RESCORE_FACTOR: int = 4
 
     PRIMARY_LANG: str = "en"
     DEFAULT_LANG: str = "en"
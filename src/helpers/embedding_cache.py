@@ -0,0 +1,126 @@
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import List
+
+import numpy as np
+
+from models.EmbeddingCacheModel import EmbeddingCacheModel
+
+
+class EmbeddingCache:
+    """
+    Two-tier embedding cache keyed by (provider, embedding model id, document type, sha256(text)).
+
+    The first tier is an in-process LRU dict bounded to `max_memory_entries`, holding float32 arrays
+    (about 6 KB per 1536-d vector instead of ~50 KB as a list of floats); the second is the
+    embeddings_cache table, shared by every worker and kept across restarts. Entries of other providers
+    or model ids are never read back, and `purge_stale_entries` drops them from Postgres at startup.
+    """
+
+    def __init__(self, db_client, embedding_provider: str, embedding_model_id: str,
+                 max_memory_entries: int = 10000, use_db: bool = True):
+        self.embedding_cache_model = EmbeddingCacheModel(db_client=db_client)
+        self.embedding_provider = embedding_provider
+        self.embedding_model_id = embedding_model_id
+        self.max_memory_entries = max_memory_entries
+        self.use_db = use_db
+
+        self.memory_entries = OrderedDict()
+        self.stats = {"memory_hits": 0, "db_hits": 0, "misses": 0}
+
+        self.logger = logging.getLogger("uvicorn.error")
+
+    @staticmethod
+    def hash_text(text: str):
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def _memory_get(self, key: tuple):
+        vector = self.memory_entries.get(key)
+        if vector is None:
+            return None
+
+        self.memory_entries.move_to_end(key)
+        return vector.tolist()
+
+    def _memory_set(self, key: tuple, vector: list):
+        if self.max_memory_entries <= 0:
+            return
+
+        self.memory_entries[key] = np.asarray(vector, dtype=np.float32)
+        self.memory_entries.move_to_end(key)
+        while len(self.memory_entries) > self.max_memory_entries:
+            self.memory_entries.popitem(last=False)
+
+    async def get_many(self, texts: List[str], document_type: str):
+        """Return the cached vector of every text, or None where it is not cached."""
+        text_hashes = [self.hash_text(t) for t in texts]
+        vectors = [
+            self._memory_get((document_type, text_hash))
+            for text_hash in text_hashes
+        ]
+        self.stats["memory_hits"] += sum(v is not None for v in vectors)
+
+        missing_hashes = [h for h, v in zip(text_hashes, vectors) if v is None]
+        if self.use_db and missing_hashes:
+            try:
+                db_vectors = await self.embedding_cache_model.get_embeddings(
+                    embedding_provider=self.embedding_provider,
+                    embedding_model_id=self.embedding_model_id,
+                    document_type=document_type,
+                    text_hashes=list(set(missing_hashes))
+                )
+            except Exception as e:
+                self.logger.error(f"Error while reading the embeddings cache: {e}")
+                db_vectors = {}
+
+            for i, text_hash in enumerate(text_hashes):
+                if vectors[i] is None and text_hash in db_vectors:
+                    vectors[i] = db_vectors[text_hash]
+                    self._memory_set((document_type, text_hash), vectors[i])
+                    self.stats["db_hits"] += 1
+
+        self.stats["misses"] += sum(v is None for v in vectors)
+        return vectors
+
+    async def set_many(self, texts: List[str], vectors: List[list], document_type: str):
+        embeddings = {}
+        for text, vector in zip(texts, vectors):
+            text_hash = self.hash_text(text)
+            self._memory_set((document_type, text_hash), vector)
+            embeddings[text_hash] = vector
+
+        if not self.use_db:
+            return
+
+        try:
+            await self.embedding_cache_model.insert_embeddings(
+                embedding_provider=self.embedding_provider,
+                embedding_model_id=self.embedding_model_id,
+                document_type=document_type,
+                embeddings=embeddings
+            )
+        except Exception as e:
+            self.logger.error(f"Error while writing the embeddings cache: {e}")
+
+    async def purge_stale_entries(self):
+        if not self.use_db:
+            return 0
+
+        deleted_count = await self.embedding_cache_model.delete_stale_embeddings(
+            embedding_provider=self.embedding_provider,
+            embedding_model_id=self.embedding_model_id
+        )
+        if deleted_count:
+            self.logger.info(f"Purged {deleted_count} embeddings cached for other embedding models")
+
+        return deleted_count
+
+    def get_stats(self):
+        lookups = sum(self.stats.values())
+        hits = self.stats["memory_hits"] + self.stats["db_hits"]
+        return {
+            **self.stats,
+            "memory_entries": len(self.memory_entries),
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        }
@@ -0,0 +1,144 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+
+from models.JobModel import JobModel
+from models.db_schemes import Job
+from models.enums.JobEnums import JobStatusEnum
+
+
+class JobCancelledError(Exception):
+    pass
+
+
+class JobRunner:
+    """
+    In-process asyncio runner for long operations (processing, index pushes).
+
+    Job records live in Postgres, so status and progress can be read from any worker. Each worker runs
+    at most `max_concurrent_jobs` of its own jobs at a time; the rest stay pending. A cancel request is
+    stored on the record and picked up by the owning worker the next time the job reports progress.
+
+    Every `heartbeat_seconds` a runner touches the jobs it owns and fails unfinished jobs that nobody
+    touched for three heartbeats, so jobs of a restarted or crashed worker do not stay running forever.
+    """
+
+    def __init__(self, db_client, max_concurrent_jobs: int = 2, heartbeat_seconds: int = 30):
+        self.job_model = JobModel(db_client=db_client)
+        self.job_slots = asyncio.Semaphore(max_concurrent_jobs)
+        self.running_tasks = {}
+
+        self.heartbeat_seconds = heartbeat_seconds
+        self.heartbeat_task = None
+
+        # set by `shutdown`, so jobs cancelled by a stopping worker fail instead of showing as user-cancelled
+        self.is_shutting_down = False
+
+        self.logger = logging.getLogger("uvicorn.error")
+
+    async def submit(self, job_type: str, job_fn, project_id: int = None, job_params: dict = None):
+        """
+        Record a new job and schedule `job_fn(report_progress)` in the background.
+        `job_fn` returns the job result dict, or raises to fail the job.
+        """
+        job = await self.job_model.create_job(job=Job(
+            job_type=job_type,
+            job_status=JobStatusEnum.PENDING.value,
+            job_params=job_params,
+            job_project_id=project_id,
+        ))
+
+        job_id = job.job_id
+        task = asyncio.create_task(self._run(job_id=job_id, job_fn=job_fn))
+        self.running_tasks[job_id] = task
+        task.add_done_callback(lambda _: self.running_tasks.pop(job_id, None))
+
+        return job
+
+    async def cancel(self, job_id: int):
+        is_requested = await self.job_model.request_job_cancel(job_id=job_id)
+
+        task = self.running_tasks.get(job_id)
+        if is_requested and task is not None:
+            task.cancel()
+
+        return is_requested
+
+    async def start(self):
+        self.heartbeat_task = asyncio.create_task(self._heartbeat())
+
+    async def _heartbeat(self):
+        while True:
+            try:
+                now = datetime.now(timezone.utc)
+                await self.job_model.touch_jobs(job_ids=list(self.running_tasks.keys()))
+
+                stale_jobs_count = await self.job_model.fail_stale_jobs(
+                    stale_before=now - timedelta(seconds=3 * self.heartbeat_seconds),
+                    finished_at=now
+                )
+                if stale_jobs_count:
+                    self.logger.warning(f"Closed {stale_jobs_count} interrupted jobs")
+            except Exception as e:
+                self.logger.error(f"Error while checking jobs heartbeat: {e}")
+
+            await asyncio.sleep(self.heartbeat_seconds)
+
+    async def shutdown(self):
+        self.is_shutting_down = True
+
+        if self.heartbeat_task is not None:
+            self.heartbeat_task.cancel()
+
+        tasks = list(self.running_tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run(self, job_id: int, job_fn):
+
+        async def report_progress(job_progress: dict):
+            job_status = await self.job_model.update_job_progress(job_id=job_id, job_progress=job_progress)
+            if job_status == JobStatusEnum.CANCELLING.value:
+                raise JobCancelledError()
+
+        try:
+            async with self.job_slots:
+                is_started = await self.job_model.start_job(job_id=job_id, started_at=datetime.now(timezone.utc))
+                if not is_started:
+                    raise JobCancelledError()
+
+                job_result = await job_fn(report_progress)
+
+        except asyncio.CancelledError:
+            if self.is_shutting_down:
+                self.logger.warning(f"Job interrupted by shutdown: {job_id}")
+                await self._finish(job_id=job_id, job_status=JobStatusEnum.FAILED.value,
+                                   job_error="Interrupted by worker shutdown")
+                return
+
+            self.logger.info(f"Job cancelled: {job_id}")
+            await self._finish(job_id=job_id, job_status=JobStatusEnum.CANCELLED.value)
+
+        except JobCancelledError:
+            self.logger.info(f"Job cancelled: {job_id}")
+            await self._finish(job_id=job_id, job_status=JobStatusEnum.CANCELLED.value)
+
+        except Exception as e:
+            self.logger.error(f"Job failed: {job_id}: {e}")
+            await self._finish(job_id=job_id, job_status=JobStatusEnum.FAILED.value, job_error=str(e))
+
+        else:
+            await self._finish(job_id=job_id, job_status=JobStatusEnum.COMPLETED.value, job_result=job_result)
+
+    async def _finish(self, job_id: int, job_status: str, job_result: dict = None, job_error: str = None):
+        try:
+            await self.job_model.finish_job(
+                job_id=job_id,
+                job_status=job_status,
+                job_result=job_result,
+                job_error=job_error,
+                finished_at=datetime.now(timezone.utc),
+            )
+        except Exception as e:
+            self.logger.error(f"Error while finishing job: {job_id}: {e}")
@@ -1,11 +1,20 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
 from fastapi import FastAPI
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 
 # from motor.motor_asyncio import AsyncIOMotorClient
+from helpers.answer_cache import AnswerCache
 from helpers.config import get_settings
-from routes import base, data, nlp
+from helpers.embedding_cache import EmbeddingCache
+from helpers.job_runner import JobRunner
+from routes import base, data, nlp, jobs
+from stores.llm.EmbeddingBatcher import EmbeddingBatcher
 from stores.llm.LLMProviderFactory import LLMProviderFactory
+from stores.llm.QueryEmbeddingCoalescer import QueryEmbeddingCoalescer
+from stores.llm.TokenCounter import TokenCounter
 from stores.llm.templates.template_parser import TemplateParser
 from stores.vectordb.VectorDBProviderFactory import VectorDBProviderFactory
 
@@ -22,18 +31,65 @@ async def startup_events():
         app.db_engine, class_=AsyncSession, expire_on_commit=False
     )
 
+    # processing pool (file parsing and chunking)
+    # spawn: forked workers would inherit the running event loop and the engine's open connections
+    app.process_pool = ProcessPoolExecutor(max_workers=settings.PROCESSING_MAX_WORKERS,
+                                           mp_context=multiprocessing.get_context("spawn"))
+
     llm_provider_factory = LLMProviderFactory(settings)
-    vectordb_provider_factory = VectorDBProviderFactory(config=settings, db_client=app.db_client)
+    app.llm_http_client = llm_provider_factory.http_client
+    vectordb_provider_factory = VectorDBProviderFactory(config=settings, db_client=app.db_client,
+                                                        db_engine=app.db_engine)
 
     # generation client
     app.generation_client = llm_provider_factory.create(provider=settings.GENERATION_BACKEND)
     app.generation_client.set_generation_model(model_id=settings.GENERATION_MODEL_ID)
 
+    # token counting for the RAG context budget (per-chunk counts are cached)
+    app.token_counter = TokenCounter(model_id=settings.GENERATION_MODEL_ID)
+
     # embedding client
     app.embedding_client = llm_provider_factory.create(provider=settings.EMBEDDING_BACKEND)
     app.embedding_client.set_embedding_model(model_id=settings.EMBEDDING_MODEL_ID,
                                              embedding_size=settings.EMBEDDING_MODEL_SIZE)
 
+    # embedding batcher (provider batch limits, bounded concurrency, rate-limit retries)
+    app.embedding_batcher = EmbeddingBatcher(
+        embedding_client=app.embedding_client,
+        max_concurrency=settings.EMBEDDING_BATCH_MAX_CONCURRENCY,
+        max_retries=settings.EMBEDDING_BATCH_MAX_RETRIES,
+        backoff_base=settings.EMBEDDING_BATCH_BACKOFF_BASE,
+        backoff_max=settings.EMBEDDING_BATCH_BACKOFF_MAX
+    )
+
+    # query embeddings arriving within the window are sent as one batch (a window of 0 disables it)
+    app.query_coalescer = None
+    if settings.EMBEDDING_QUERY_COALESCE_WINDOW_MS > 0:
+        app.query_coalescer = QueryEmbeddingCoalescer(
+            embedding_client=app.embedding_batcher,
+            window_ms=settings.EMBEDDING_QUERY_COALESCE_WINDOW_MS,
+            max_batch_size=settings.EMBEDDING_QUERY_COALESCE_MAX_BATCH
+        )
+
+    # embedding cache (in-memory LRU + Postgres), entries of previous embedding models are purged
+    app.embedding_cache = EmbeddingCache(
+        db_client=app.db_client,
+        embedding_provider=settings.EMBEDDING_BACKEND,
+        embedding_model_id=settings.EMBEDDING_MODEL_ID,
+        max_memory_entries=settings.EMBEDDING_CACHE_MAX_ENTRIES,
+        use_db=settings.EMBEDDING_CACHE_USE_DB
+    )
+    await app.embedding_cache.purge_stale_entries()
+
+    # RAG answer cache (exact prompt + semantic question match), versioned per project in Postgres so a
+    # re-index/reset in any worker drops it everywhere
+    app.answer_cache = AnswerCache(
+        db_client=app.db_client,
+        max_entries_per_project=settings.ANSWER_CACHE_MAX_ENTRIES,
+        similarity_threshold=settings.ANSWER_CACHE_SIMILARITY_THRESHOLD,
+        ttl_seconds=settings.ANSWER_CACHE_TTL_SECONDS
+    )
+
     # vector DB client
     app.vectordb_client = vectordb_provider_factory.create(provider=settings.VECTOR_DB_BACKEND)
     await app.vectordb_client.connect()
@@ -41,10 +97,19 @@ async def startup_events():
     # Template Parser
     app.template_parser = TemplateParser(language=settings.PRIMARY_LANG, default_language=settings.DEFAULT_LANG)
 
+    # background jobs (processing, index pushes); started last, jobs use every client above
+    app.job_runner = JobRunner(db_client=app.db_client, max_concurrent_jobs=settings.JOBS_MAX_CONCURRENT,
+                               heartbeat_seconds=settings.JOBS_HEARTBEAT_SECONDS)
+    await app.job_runner.start()
+
 
 async def shutdown_events():
+    # stop jobs before the clients they use are closed
+    await app.job_runner.shutdown()
     await app.db_engine.dispose()
+    await app.llm_http_client.aclose()
     await app.vectordb_client.disconnect()
+    app.process_pool.shutdown(wait=False, cancel_futures=True)
 
 
 
@@ -54,6 +119,7 @@ app.add_event_handler("shutdown", shutdown_events)
 app.include_router(base.base_router)
 app.include_router(data.data_router)
 app.include_router(nlp.nlp_router)
+app.include_router(jobs.jobs_router)
 
 if __name__ == "__main__":
     import uvicorn
@@ -1,8 +1,9 @@
-from sqlalchemy import func
+from sqlalchemy import func, update, literal_column
 from sqlalchemy.future import select
 
 from .BaseDataModel import BaseDataModel
 from .db_schemes import Asset
+from .enums.AssetConfigEnum import AssetConfigEnum
 
 
 class AssetModel(BaseDataModel):
@@ -45,6 +46,29 @@ class AssetModel(BaseDataModel):
 
         return assets, total_pages
 
+    async def iter_project_assets(self, asset_project_id: int, asset_type: str, batch_size: int = 100):
+        """
+        Stream every asset of `asset_type` in the project, ordered by asset_id, using keyset pagination
+        on the (asset_project_id, asset_type, asset_id) index. No COUNT query is issued.
+        """
+        last_asset_id = 0
+        while True:
+            async with self.db_client() as session:
+                query = select(Asset).where(
+                    Asset.asset_project_id == asset_project_id,
+                    Asset.asset_type == asset_type,
+                    Asset.asset_id > last_asset_id
+                ).order_by(Asset.asset_id).limit(batch_size)
+                result = await session.execute(query)
+                assets = result.scalars().all()
+
+            for asset in assets:
+                yield asset
+
+            if len(assets) < batch_size:
+                break
+            last_asset_id = assets[-1].asset_id
+
     async def get_asset_record(self, asset_project_id: int, asset_name: str):
         async with self.db_client() as session:
             query = select(Asset).where(
@@ -54,3 +78,55 @@ class AssetModel(BaseDataModel):
             result = await session.execute(query)
             record = result.scalar_one_or_none()
         return record
+
+    async def get_asset_by_hash(self, asset_project_id: int, asset_hash: str):
+        async with self.db_client() as session:
+            query = select(Asset).where(
+                Asset.asset_project_id == asset_project_id,
+                Asset.asset_hash == asset_hash
+            ).order_by(Asset.asset_id).limit(1)
+            result = await session.execute(query)
+            record = result.scalar_one_or_none()
+        return record
+
+    async def update_asset_config(self, asset_id: int, asset_config: dict):
+        async with self.db_client() as session:
+            stmt = update(Asset).where(Asset.asset_id == asset_id).values(asset_config=asset_config)
+            result = await session.execute(stmt)
+            await session.commit()
+        return result.rowcount
+
+    async def reset_project_processing_state(self, asset_project_id: int):
+        async with self.db_client() as session:
+            stmt = update(Asset).where(
+                Asset.asset_project_id == asset_project_id,
+                Asset.asset_config.has_key(AssetConfigEnum.PROCESSING.value)
+            ).values(asset_config=Asset.asset_config.op("-")(AssetConfigEnum.PROCESSING.value))
+            result = await session.execute(stmt)
+            await session.commit()
+        return result.rowcount
+
+    async def get_project_assets_pending_index(self, asset_project_id: int):
+        indexed_flag = (AssetConfigEnum.PROCESSING.value, AssetConfigEnum.IS_INDEXED.value)
+        async with self.db_client() as session:
+            query = select(Asset.asset_id).where(
+                Asset.asset_project_id == asset_project_id,
+                Asset.asset_config[indexed_flag].astext == "false"
+            )
+            result = await session.execute(query)
+            asset_ids = result.scalars().all()
+        return asset_ids
+
+    async def mark_assets_indexed(self, asset_ids: list):
+        if not asset_ids:
+            return 0
+
+        indexed_path = "{" + AssetConfigEnum.PROCESSING.value + "," + AssetConfigEnum.IS_INDEXED.value + "}"
+        async with self.db_client() as session:
+            stmt = update(Asset).where(Asset.asset_id.in_(asset_ids)).values(
+                asset_config=func.jsonb_set(Asset.asset_config, literal_column(f"'{indexed_path}'"),
+                                            literal_column("'true'::jsonb"))
+            )
+            result = await session.execute(stmt)
+            await session.commit()
+        return result.rowcount
@@ -1,3 +1,6 @@
+import json
+import uuid
+
 from .BaseDataModel import BaseDataModel
 from .db_schemes import DataChunk
 from bson.objectid import ObjectId
@@ -34,14 +37,48 @@ class ChunkModel(BaseDataModel):
         return chunk
 
 
-    async def insert_many_chunks(self, chunks: list, batch_size: int = 100):
+    async def bulk_insert_chunks(self, chunks: list):
+        """
+        Load chunk dicts (chunk_text, chunk_metadata, chunk_order, chunk_project_id, chunk_asset_id)
+        with asyncpg's binary COPY, bypassing the ORM. COPY can not return generated keys, so the
+        chunk ids are reserved from the table sequence first; they are returned in input order.
+        """
+        if not chunks:
+            return []
+
+        chunk_columns = ["chunk_id", "chunk_uuid", "chunk_text", "chunk_metadata",
+                         "chunk_order", "chunk_project_id", "chunk_asset_id"]
+
         async with self.db_client() as session:
             async with session.begin():
-                for i in range(0, len(chunks), batch_size):
-                    batch = chunks[i:i + batch_size]
-                    session.add_all(batch)
-            await session.commit()
-        return len(chunks)
+                chunk_id_sequence = func.pg_get_serial_sequence(DataChunk.__tablename__, "chunk_id")
+                ids_result = await session.execute(
+                    select(func.nextval(chunk_id_sequence)).select_from(func.generate_series(1, len(chunks)))
+                )
+                chunks_ids = ids_result.scalars().all()
+
+                records = [
+                    (
+                        chunk_id,
+                        uuid.uuid4(),
+                        chunk["chunk_text"],
+                        json.dumps(chunk.get("chunk_metadata") or {}, ensure_ascii=False),
+                        chunk.get("chunk_order"),
+                        chunk.get("chunk_project_id"),
+                        chunk.get("chunk_asset_id"),
+                    )
+                    for chunk_id, chunk in zip(chunks_ids, chunks)
+                ]
+
+                connection = await session.connection()
+                raw_connection = await connection.get_raw_connection()
+                await raw_connection.driver_connection.copy_records_to_table(
+                    DataChunk.__tablename__,
+                    records=records,
+                    columns=chunk_columns
+                )
+
+        return chunks_ids
 
 
     async def delete_chunks_by_project_id(self, project_id: ObjectId):
@@ -52,19 +89,81 @@ class ChunkModel(BaseDataModel):
         return result.rowcount
 
 
-    async def get_poject_chunks(self, project_id: ObjectId, page_no: int = 1, page_size: int = 50):
+    async def get_asset_chunks_ids(self, asset_id: int):
+        async with self.db_client() as session:
+            stmt = select(DataChunk.chunk_id).where(DataChunk.chunk_asset_id == asset_id)
+            result = await session.execute(stmt)
+            chunks_ids = result.scalars().all()
+        return chunks_ids
+
+
+    async def delete_chunks_by_asset_id(self, asset_id: int):
         async with self.db_client() as session:
-            stmt = select(DataChunk).where(DataChunk.chunk_project_id == project_id).offset(
-                (page_no - 1) * page_size).limit(page_size)
+            stmt = delete(DataChunk).where(DataChunk.chunk_asset_id == asset_id)
+            result = await session.execute(stmt)
+            await session.commit()
+        return result.rowcount
+
+
+    async def delete_chunks_by_ids(self, chunks_ids: list):
+        if not chunks_ids:
+            return 0
+
+        async with self.db_client() as session:
+            stmt = delete(DataChunk).where(DataChunk.chunk_id.in_(chunks_ids))
+            result = await session.execute(stmt)
+            await session.commit()
+        return result.rowcount
+
+
+    async def get_poject_chunks(self, project_id: ObjectId, page_no: int = 1, page_size: int = 50,
+                                asset_ids: list = None):
+        async with self.db_client() as session:
+            stmt = select(DataChunk).where(DataChunk.chunk_project_id == project_id)
+            if asset_ids is not None:
+                stmt = stmt.where(DataChunk.chunk_asset_id.in_(asset_ids))
+            stmt = stmt.order_by(DataChunk.chunk_id).offset((page_no - 1) * page_size).limit(page_size)
             result = await session.execute(stmt)
             records = result.scalars().all()
         return records
 
 
-    async def get_total_chunks_count(self, project_id: ObjectId):
+    async def iter_project_chunks_batches(self, project_id: int, batch_size: int = 50, asset_ids: list = None):
+        """
+        Keyset-paginated reader: yields lists of `(chunk_id, chunk_text, chunk_metadata)` rows ordered by
+        chunk_id, served by the (chunk_project_id, chunk_id) index. Plain rows skip the ORM identity map,
+        and every page costs the same no matter how deep into the project it is.
+        """
+        last_chunk_id = 0
+        while True:
+            async with self.db_client() as session:
+                stmt = select(DataChunk.chunk_id, DataChunk.chunk_text, DataChunk.chunk_metadata).where(
+                    DataChunk.chunk_project_id == project_id,
+                    DataChunk.chunk_id > last_chunk_id
+                )
+                if asset_ids is not None:
+                    stmt = stmt.where(DataChunk.chunk_asset_id.in_(asset_ids))
+                stmt = stmt.order_by(DataChunk.chunk_id).limit(batch_size)
+
+                result = await session.execute(stmt)
+                records = result.all()
+
+            if len(records) == 0:
+                break
+
+            yield records
+
+            if len(records) < batch_size:
+                break
+            last_chunk_id = records[-1].chunk_id
+
+
+    async def get_total_chunks_count(self, project_id: ObjectId, asset_ids: list = None):
         total_count = 0
         async with self.db_client() as session:
             count_sql = select(func.count(DataChunk.chunk_id)).where(DataChunk.chunk_project_id == project_id)
+            if asset_ids is not None:
+                count_sql = count_sql.where(DataChunk.chunk_asset_id.in_(asset_ids))
             records_count = await session.execute(count_sql)
             total_count = records_count.scalar()
 
@@ -0,0 +1,74 @@
+from typing import List
+
+from sqlalchemy import delete, or_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.future import select
+
+from .BaseDataModel import BaseDataModel
+from .db_schemes import EmbeddingCacheEntry
+
+
+class EmbeddingCacheModel(BaseDataModel):
+
+    def __init__(self, db_client: object):
+        super().__init__(db_client=db_client)
+        self.db_client = db_client
+
+    @classmethod
+    async def create_instance(cls, db_client: object):
+        instance = cls(db_client)
+        return instance
+
+    async def get_embeddings(self, embedding_provider: str, embedding_model_id: str,
+                             document_type: str, text_hashes: List[str]):
+        """Return a {text_hash: vector} dict for the cached hashes."""
+        if not text_hashes:
+            return {}
+
+        async with self.db_client() as session:
+            stmt = select(EmbeddingCacheEntry.text_hash, EmbeddingCacheEntry.embedding_vector).where(
+                EmbeddingCacheEntry.embedding_provider == embedding_provider,
+                EmbeddingCacheEntry.embedding_model_id == embedding_model_id,
+                EmbeddingCacheEntry.document_type == document_type,
+                EmbeddingCacheEntry.text_hash.in_(text_hashes)
+            )
+            result = await session.execute(stmt)
+            embeddings = {text_hash: vector for text_hash, vector in result.all()}
+        return embeddings
+
+    async def insert_embeddings(self, embedding_provider: str, embedding_model_id: str,
+                                document_type: str, embeddings: dict, batch_size: int = 1000):
+        """Insert in multi-row batches: each row takes 5 bind parameters and asyncpg allows 32767."""
+        if not embeddings:
+            return 0
+
+        entries = [
+            {
+                "embedding_provider": embedding_provider,
+                "embedding_model_id": embedding_model_id,
+                "document_type": document_type,
+                "text_hash": text_hash,
+                "embedding_vector": vector,
+            }
+            for text_hash, vector in embeddings.items()
+        ]
+
+        inserted_count = 0
+        async with self.db_client() as session:
+            for i in range(0, len(entries), batch_size):
+                stmt = insert(EmbeddingCacheEntry).values(entries[i:i + batch_size]).on_conflict_do_nothing()
+                result = await session.execute(stmt)
+                inserted_count += result.rowcount
+            await session.commit()
+        return inserted_count
+
+    async def delete_stale_embeddings(self, embedding_provider: str, embedding_model_id: str):
+        """Drop every entry that was not produced by the current provider and model."""
+        async with self.db_client() as session:
+            stmt = delete(EmbeddingCacheEntry).where(or_(
+                EmbeddingCacheEntry.embedding_provider != embedding_provider,
+                EmbeddingCacheEntry.embedding_model_id != embedding_model_id
+            ))
+            result = await session.execute(stmt)
+            await session.commit()
+        return result.rowcount
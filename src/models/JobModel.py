@@ -0,0 +1,121 @@
+from sqlalchemy import update, case, func, and_, or_
+from sqlalchemy.future import select
+
+from .BaseDataModel import BaseDataModel
+from .db_schemes import Job
+from .enums.JobEnums import JobStatusEnum
+
+
+class JobModel(BaseDataModel):
+
+    def __init__(self, db_client: object):
+        super().__init__(db_client=db_client)
+        self.db_client = db_client
+
+    @classmethod
+    async def create_instance(cls, db_client: object):
+        instance = cls(db_client)
+        return instance
+
+    async def create_job(self, job: Job):
+        async with self.db_client() as session:
+            async with session.begin():
+                session.add(job)
+            await session.commit()
+            await session.refresh(job)
+
+        return job
+
+    async def get_job(self, job_id: int):
+        async with self.db_client() as session:
+            result = await session.execute(select(Job).where(Job.job_id == job_id))
+            job = result.scalar_one_or_none()
+        return job
+
+    async def update_job(self, job_id: int, **values):
+        async with self.db_client() as session:
+            stmt = update(Job).where(Job.job_id == job_id).values(**values)
+            result = await session.execute(stmt)
+            await session.commit()
+        return result.rowcount
+
+    async def finish_job(self, job_id: int, job_status: str, **values):
+        """
+        Store the final status. A job that completes after a cancel request ends as cancelled, so the
+        request is not silently overwritten.
+        """
+        final_status = job_status
+        if job_status == JobStatusEnum.COMPLETED.value:
+            final_status = case(
+                (Job.job_status == JobStatusEnum.CANCELLING.value, JobStatusEnum.CANCELLED.value),
+                else_=JobStatusEnum.COMPLETED.value
+            )
+
+        return await self.update_job(job_id=job_id, job_status=final_status, **values)
+
+    async def touch_jobs(self, job_ids: list):
+        """Heartbeat of the jobs owned by a live runner."""
+        if not job_ids:
+            return 0
+
+        async with self.db_client() as session:
+            stmt = update(Job).where(Job.job_id.in_(job_ids)).values(updated_at=func.now())
+            result = await session.execute(stmt)
+            await session.commit()
+        return result.rowcount
+
+    async def fail_stale_jobs(self, stale_before, finished_at):
+        """
+        Close unfinished jobs whose runner stopped sending heartbeats (the worker was restarted or
+        crashed): cancel requests end as cancelled, everything else as failed.
+        """
+        is_stale = or_(
+            Job.updated_at < stale_before,
+            and_(Job.updated_at.is_(None), Job.created_at < stale_before)
+        )
+
+        async with self.db_client() as session:
+            cancelled_stmt = update(Job).where(
+                Job.job_status == JobStatusEnum.CANCELLING.value, is_stale
+            ).values(job_status=JobStatusEnum.CANCELLED.value, finished_at=finished_at)
+            failed_stmt = update(Job).where(
+                Job.job_status.in_([JobStatusEnum.PENDING.value, JobStatusEnum.RUNNING.value]), is_stale
+            ).values(job_status=JobStatusEnum.FAILED.value, finished_at=finished_at,
+                     job_error="Interrupted: the worker running this job stopped")
+
+            cancelled_result = await session.execute(cancelled_stmt)
+            failed_result = await session.execute(failed_stmt)
+            await session.commit()
+        return cancelled_result.rowcount + failed_result.rowcount
+
+    async def start_job(self, job_id: int, started_at):
+        """Move a pending job to running; returns False when it was cancelled while waiting."""
+        async with self.db_client() as session:
+            stmt = update(Job).where(
+                Job.job_id == job_id,
+                Job.job_status == JobStatusEnum.PENDING.value
+            ).values(job_status=JobStatusEnum.RUNNING.value, started_at=started_at)
+            result = await session.execute(stmt)
+            await session.commit()
+        return result.rowcount > 0
+
+    async def update_job_progress(self, job_id: int, job_progress: dict):
+        """Store the progress and return the current job status, so runners can notice cancel requests."""
+        async with self.db_client() as session:
+            stmt = update(Job).where(Job.job_id == job_id).values(
+                job_progress=job_progress
+            ).returning(Job.job_status)
+            result = await session.execute(stmt)
+            job_status = result.scalar_one_or_none()
+            await session.commit()
+        return job_status
+
+    async def request_job_cancel(self, job_id: int):
+        async with self.db_client() as session:
+            stmt = update(Job).where(
+                Job.job_id == job_id,
+                Job.job_status.in_([JobStatusEnum.PENDING.value, JobStatusEnum.RUNNING.value])
+            ).values(job_status=JobStatusEnum.CANCELLING.value)
+            result = await session.execute(stmt)
+            await session.commit()
+        return result.rowcount > 0
@@ -1,4 +1,4 @@
-from sqlalchemy import func
+from sqlalchemy import func, update
 from sqlalchemy.future import select
 
 from .BaseDataModel import BaseDataModel
@@ -54,3 +54,13 @@ class ProjectModel(BaseDataModel):
             projects = results.scalars().all()
 
             return projects, total_pages
+
+    async def bump_index_version(self, project_id: int):
+        async with self.db_client() as session:
+            stmt = update(Project).where(Project.project_id == project_id).values(
+                project_index_version=Project.project_index_version + 1
+            ).returning(Project.project_index_version)
+            result = await session.execute(stmt)
+            index_version = result.scalar_one_or_none()
+            await session.commit()
+        return index_version
@@ -14,6 +14,8 @@ from schemes import SQLAlchemyBase
 from schemes.asset import Asset
 from schemes.project import Project
 from schemes.datachunk import DataChunk, RetrievedDocument
+from schemes.job import Job
+from schemes.embedding_cache import EmbeddingCacheEntry
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -0,0 +1,29 @@
+"""Add asset hash
+
+Revision ID: 3c1d9e5a7b20
+Revises: 7aa57ac7d918
+Create Date: 2026-10-18 09:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '3c1d9e5a7b20'
+down_revision: Union[str, Sequence[str], None] = '7aa57ac7d918'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('assets', sa.Column('asset_hash', sa.String(length=64), nullable=True))
+    op.create_index('ix_assets_project_id_hash', 'assets', ['asset_project_id', 'asset_hash'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_assets_project_id_hash', table_name='assets')
+    op.drop_column('assets', 'asset_hash')
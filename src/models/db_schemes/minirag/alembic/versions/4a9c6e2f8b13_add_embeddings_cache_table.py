@@ -0,0 +1,41 @@
+"""Add embeddings cache table
+
+Revision ID: 4a9c6e2f8b13
+Revises: d07a3f58c9e1
+Create Date: 2026-10-18 12:04:17.318462
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '4a9c6e2f8b13'
+down_revision: Union[str, Sequence[str], None] = 'd07a3f58c9e1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('embeddings_cache',
+                    sa.Column('embedding_provider', sa.String(length=50), nullable=False),
+                    sa.Column('embedding_model_id', sa.String(length=255), nullable=False),
+                    sa.Column('document_type', sa.String(length=50), nullable=False),
+                    sa.Column('text_hash', sa.String(length=64), nullable=False),
+                    sa.Column('embedding_vector', postgresql.ARRAY(sa.Float()), nullable=False),
+                    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'),
+                              nullable=False),
+                    sa.PrimaryKeyConstraint('embedding_provider', 'embedding_model_id', 'document_type',
+                                            'text_hash')
+                    )
+    op.create_index('ix_embeddings_cache_provider_model', 'embeddings_cache',
+                    ['embedding_provider', 'embedding_model_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_embeddings_cache_provider_model', table_name='embeddings_cache')
+    op.drop_table('embeddings_cache')
@@ -0,0 +1,28 @@
+"""Add project index version
+
+Revision ID: 6f2d8b4c1e75
+Revises: 4a9c6e2f8b13
+Create Date: 2026-10-18 16:21:09.514873
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '6f2d8b4c1e75'
+down_revision: Union[str, Sequence[str], None] = '4a9c6e2f8b13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('projects', sa.Column('project_index_version', sa.Integer(), server_default='0',
+                                        nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('projects', 'project_index_version')
@@ -0,0 +1,26 @@
+"""Add chunks (project_id, chunk_id) index
+
+Revision ID: 8e4f2a6c1d37
+Revises: 3c1d9e5a7b20
+Create Date: 2026-10-18 10:05:17.552913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '8e4f2a6c1d37'
+down_revision: Union[str, Sequence[str], None] = '3c1d9e5a7b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_chunks_project_id_chunk_id', 'chunks', ['chunk_project_id', 'chunk_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_chunks_project_id_chunk_id', table_name='chunks')
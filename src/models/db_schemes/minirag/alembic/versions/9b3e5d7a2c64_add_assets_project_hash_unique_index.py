@@ -0,0 +1,41 @@
+"""Add assets project hash unique index
+
+Revision ID: 9b3e5d7a2c64
+Revises: 6f2d8b4c1e75
+Create Date: 2026-10-18 17:05:32.640218
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '9b3e5d7a2c64'
+down_revision: Union[str, Sequence[str], None] = '6f2d8b4c1e75'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # concurrent uploads may already have stored the same content twice; the oldest asset keeps the hash
+    op.execute(sa.text(
+        'UPDATE assets SET asset_hash = NULL '
+        'WHERE asset_id IN ('
+        'SELECT asset_id FROM ('
+        'SELECT asset_id, row_number() OVER '
+        '(PARTITION BY asset_project_id, asset_hash ORDER BY asset_id) AS hash_rank '
+        'FROM assets WHERE asset_hash IS NOT NULL'
+        ') ranked_assets WHERE hash_rank > 1'
+        ')'
+    ))
+
+    op.drop_index('ix_assets_project_id_hash', table_name='assets')
+    op.create_index('ix_assets_project_id_hash', 'assets', ['asset_project_id', 'asset_hash'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_assets_project_id_hash', table_name='assets')
+    op.create_index('ix_assets_project_id_hash', 'assets', ['asset_project_id', 'asset_hash'], unique=False)
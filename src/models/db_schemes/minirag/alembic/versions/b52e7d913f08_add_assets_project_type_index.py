@@ -0,0 +1,27 @@
+"""Add assets (project_id, type, asset_id) index
+
+Revision ID: b52e7d913f08
+Revises: 8e4f2a6c1d37
+Create Date: 2026-10-18 10:48:02.104377
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'b52e7d913f08'
+down_revision: Union[str, Sequence[str], None] = '8e4f2a6c1d37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_assets_project_id_type_asset_id', 'assets',
+                    ['asset_project_id', 'asset_type', 'asset_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_assets_project_id_type_asset_id', table_name='assets')
@@ -0,0 +1,52 @@
+"""Add jobs table
+
+Revision ID: d07a3f58c9e1
+Revises: b52e7d913f08
+Create Date: 2026-10-18 11:36:54.870129
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'd07a3f58c9e1'
+down_revision: Union[str, Sequence[str], None] = 'b52e7d913f08'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('jobs',
+                    sa.Column('job_id', sa.Integer(), autoincrement=True, nullable=False),
+                    sa.Column('job_uuid', sa.UUID(), nullable=False),
+                    sa.Column('job_type', sa.String(length=255), nullable=False),
+                    sa.Column('job_status', sa.String(length=50), nullable=False),
+                    sa.Column('job_params', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+                    sa.Column('job_progress', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+                    sa.Column('job_result', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+                    sa.Column('job_error', sa.String(), nullable=True),
+                    sa.Column('job_project_id', sa.Integer(), nullable=True),
+                    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'),
+                              nullable=False),
+                    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+                    sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+                    sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+                    sa.ForeignKeyConstraint(['job_project_id'], ['projects.project_id'], ),
+                    sa.PrimaryKeyConstraint('job_id'),
+                    sa.UniqueConstraint('job_uuid')
+                    )
+    op.create_index(op.f('ix_jobs_job_id'), 'jobs', ['job_id'], unique=False)
+    op.create_index('ix_jobs_project_id', 'jobs', ['job_project_id'], unique=False)
+    op.create_index('ix_jobs_status', 'jobs', ['job_status'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_jobs_status', table_name='jobs')
+    op.drop_index('ix_jobs_project_id', table_name='jobs')
+    op.drop_index(op.f('ix_jobs_job_id'), table_name='jobs')
+    op.drop_table('jobs')
@@ -1,4 +1,6 @@
 from .asset import Asset
 from .datachunk import DataChunk, RetrievedDocument
+from .embedding_cache import EmbeddingCacheEntry
+from .job import Job
 from .minirag_base import SQLAlchemyBase
 from .project import Project
@@ -16,6 +16,7 @@ class Asset(SQLAlchemyBase):
     asset_type = Column(String(255), nullable=True)
     asset_name = Column(String(255), nullable=True)
     asset_size = Column(Integer, nullable=True)
+    asset_hash = Column(String(64), nullable=True)
     asset_config = Column(JSONB, nullable=True)
 
     asset_project_id = Column(Integer, ForeignKey("projects.project_id"), nullable=True)
@@ -29,5 +30,7 @@ class Asset(SQLAlchemyBase):
 
     __table_args__ = (
         Index("ix_assets_project_id", "asset_project_id"),
-        Index("ix_asset_type", "asset_type")
+        Index("ix_asset_type", "asset_type"),
+        Index("ix_assets_project_id_hash", "asset_project_id", "asset_hash", unique=True),
+        Index("ix_assets_project_id_type_asset_id", "asset_project_id", "asset_type", "asset_id")
     )
@@ -29,7 +29,8 @@ class DataChunk(SQLAlchemyBase):
 
     __table_args__ = (
         Index("ix_chunks_project_id", "chunk_project_id"),
-        Index("ix_chunks_asset_id", "chunk_asset_id")
+        Index("ix_chunks_asset_id", "chunk_asset_id"),
+        Index("ix_chunks_project_id_chunk_id", "chunk_project_id", "chunk_id")
     )
 
 
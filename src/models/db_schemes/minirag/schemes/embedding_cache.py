@@ -0,0 +1,21 @@
+from sqlalchemy import Column, String, DateTime, Float, func, Index
+from sqlalchemy.dialects.postgresql import ARRAY
+
+from .minirag_base import SQLAlchemyBase
+
+
+class EmbeddingCacheEntry(SQLAlchemyBase):
+    __tablename__ = "embeddings_cache"
+
+    embedding_provider = Column(String(50), primary_key=True)
+    embedding_model_id = Column(String(255), primary_key=True)
+    document_type = Column(String(50), primary_key=True)
+    text_hash = Column(String(64), primary_key=True)
+
+    embedding_vector = Column(ARRAY(Float), nullable=False)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("ix_embeddings_cache_provider_model", "embedding_provider", "embedding_model_id"),
+    )
@@ -0,0 +1,35 @@
+import uuid
+
+from sqlalchemy import Column, Integer, String, DateTime, func, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy.orm import relationship
+
+from .minirag_base import SQLAlchemyBase
+
+
+class Job(SQLAlchemyBase):
+    __tablename__ = "jobs"
+
+    job_id = Column(Integer, primary_key=True, autoincrement=True, index=True)
+    job_uuid = Column(UUID(as_uuid=True), default=uuid.uuid4, unique=True, nullable=False)
+
+    job_type = Column(String(255), nullable=False)
+    job_status = Column(String(50), nullable=False)
+    job_params = Column(JSONB, nullable=True)
+    job_progress = Column(JSONB, nullable=True)
+    job_result = Column(JSONB, nullable=True)
+    job_error = Column(String, nullable=True)
+
+    job_project_id = Column(Integer, ForeignKey("projects.project_id"), nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now(), nullable=True)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    project = relationship("Project", back_populates="jobs")
+
+    __table_args__ = (
+        Index("ix_jobs_project_id", "job_project_id"),
+        Index("ix_jobs_status", "job_status")
+    )
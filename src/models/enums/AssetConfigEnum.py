@@ -0,0 +1,11 @@
+from enum import Enum
+
+
+class AssetConfigEnum(Enum):
+    PROCESSING = "processing"
+
+    CHUNK_SIZE = "chunk_size"
+    OVERLAP_SIZE = "overlap_size"
+    ASSET_HASH = "asset_hash"
+    PROCESSED_AT = "processed_at"
+    IS_INDEXED = "is_indexed"
@@ -0,0 +1,15 @@
+from enum import Enum
+
+
+class JobTypeEnum(Enum):
+    PROCESS = "process"
+    INDEX_PUSH = "index_push"
+
+
+class JobStatusEnum(Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    CANCELLING = "cancelling"
+    CANCELLED = "cancelled"
+    COMPLETED = "completed"
+    FAILED = "failed"
@@ -7,6 +7,7 @@ class ResponseSignal(Enum):
     FILE_SIZE_EXCEEDED = "file_size_exceeded"
     FILE_UPLOAD_SUCCESS = "file_upload_success"
     FILE_UPLOAD_FAILED = "file_upload_failed"
+    FILE_ALREADY_UPLOADED = "file_already_uploaded"
     PROCESSING_SUCCESS = "processing_success"
     PROCESSING_FAILED = "processing_failed"
     NO_FILES_ERROR = "not_found_files"
@@ -17,5 +18,14 @@ class ResponseSignal(Enum):
     VECTORDB_COLLECTION_RETRIEVED = "vectordb_collection_retrieved"
     VECTORDB_SEARCH_SUCCESS = "vectordb_search_success"
     VECTORDB_SEARCH_FAILED = "vectordb_search_failed"
+    VECTORDB_RECALL_EVALUATED = "vectordb_recall_evaluated"
+    VECTORDB_SEARCH_EXPLAINED = "vectordb_search_explained"
+    VECTORDB_INDEX_REBUILT = "vectordb_index_rebuilt"
+    VECTORDB_INDEX_REBUILD_SKIPPED = "vectordb_index_rebuild_skipped"
     RAG_ANSWER_SUCCESS = "rag_answer_success"
     RAG_ANSWER_FAILED = "rag_answer_failed"
+    JOB_SUBMITTED = "job_submitted"
+    JOB_RETRIEVED = "job_retrieved"
+    JOB_NOT_FOUND_ERROR = "job_not_found"
+    JOB_CANCEL_REQUESTED = "job_cancel_requested"
+    JOB_NOT_CANCELLABLE_ERROR = "job_not_cancellable"
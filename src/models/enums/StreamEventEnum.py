@@ -0,0 +1,8 @@
+from enum import Enum
+
+
+class StreamEventEnum(Enum):
+    SOURCES = "sources"
+    TOKEN = "token"
+    DONE = "done"
+    ERROR = "error"
@@ -1,8 +1,10 @@
+import asyncio
+import hashlib
 import logging
 import os
 
 import aiofiles
-from controllers import DataController, ProjectController, ProcessController, NLPController
+from controllers import DataController, ProjectController, ProcessController, NLPController, IngestionController
 from fastapi import APIRouter, Depends, UploadFile, status, Request
 from fastapi.responses import JSONResponse
 from helpers.config import get_settings, Settings
@@ -10,8 +12,10 @@ from models import ResponseSignal
 from models.AssetModel import AssetModel
 from models.ChunkModel import ChunkModel
 from models.ProjectModel import ProjectModel
-from models.db_schemes import DataChunk, Asset
+from models.db_schemes import Asset
+from models.enums.AssetConfigEnum import AssetConfigEnum
 from models.enums.AssetTypeEnum import AssetTypeEnum
+from sqlalchemy.exc import IntegrityError
 
 from .schemes.data import ProcessRequest
 
@@ -53,9 +57,11 @@ async def upload_data(request: Request, project_id: int, file: UploadFile,
         project_id=project_id
     )
 
+    file_hash = hashlib.sha256()
     try:
         async with aiofiles.open(file_path, "wb") as f:
             while chunk := await file.read(app_settings.FILE_DEFAULT_CHUNK_SIZE):
+                file_hash.update(chunk)
                 await f.write(chunk)
     except Exception as e:
 
@@ -73,14 +79,47 @@ async def upload_data(request: Request, project_id: int, file: UploadFile,
         db_client=request.app.db_client
     )
 
+    # the same content was uploaded before: drop the new copy and reuse the existing asset
+    existing_asset = await asset_model.get_asset_by_hash(
+        asset_project_id=project_id,
+        asset_hash=file_hash.hexdigest()
+    )
+
+    if existing_asset is not None:
+        os.remove(file_path)
+
+        return JSONResponse(
+            content={
+                "signal": ResponseSignal.FILE_ALREADY_UPLOADED.value,
+                "file_id": str(existing_asset.asset_id),
+            }
+        )
+
     asset_resource = Asset(
         asset_project_id=project_id,
         asset_type=AssetTypeEnum.FILE.value,
         asset_name=file_id,
-        asset_size=os.path.getsize(file_path)
+        asset_size=os.path.getsize(file_path),
+        asset_hash=file_hash.hexdigest()
     )
 
-    asset_record = await asset_model.create_asset(asset=asset_resource)
+    try:
+        asset_record = await asset_model.create_asset(asset=asset_resource)
+    except IntegrityError:
+        # a concurrent upload of the same content won the (asset_project_id, asset_hash) unique index
+        os.remove(file_path)
+
+        existing_asset = await asset_model.get_asset_by_hash(
+            asset_project_id=project_id,
+            asset_hash=file_hash.hexdigest()
+        )
+
+        return JSONResponse(
+            content={
+                "signal": ResponseSignal.FILE_ALREADY_UPLOADED.value,
+                "file_id": str(existing_asset.asset_id),
+            }
+        )
 
     return JSONResponse(
         content={
@@ -91,13 +130,39 @@ async def upload_data(request: Request, project_id: int, file: UploadFile,
 
 
 @data_router.post("/process/{project_id}")
-async def process_endpoint(request: Request, project_id: int, process_request: ProcessRequest):
+async def process_endpoint(request: Request, project_id: int, process_request: ProcessRequest,
+                           app_settings: Settings = Depends(get_settings)):
+    status_code, content = await process_project_files(
+        app=request.app,
+        project_id=project_id,
+        process_request=process_request,
+        app_settings=app_settings
+    )
+
+    return JSONResponse(status_code=status_code, content=content)
+
+
+async def process_project_files(app, project_id: int, process_request: ProcessRequest,
+                                app_settings: Settings, report_progress=None):
+    """
+    Body of /data/process, shared with the background job runner.
+    Returns the response status code and content; `report_progress` is awaited with progress dicts.
+    """
     chunk_size = process_request.chunk_size
     overlap_size = process_request.overlap_size
     do_reset = process_request.do_reset
+    do_stream = process_request.do_stream
+    do_incremental = process_request.do_incremental
+    do_index = process_request.do_index
+
+    # chunks overlap by `overlap_size` characters, so it must leave room for new text in every chunk
+    if overlap_size < 0 or overlap_size >= chunk_size:
+        return status.HTTP_400_BAD_REQUEST, {
+            "signal": ResponseSignal.PROCESSING_FAILED.value
+        }
 
     project_model = await ProjectModel.create_instance(
-        db_client=request.app.db_client
+        db_client=app.db_client
     )
 
     project = await project_model.get_project_or_create_one(
@@ -105,17 +170,20 @@ async def process_endpoint(request: Request, project_id: int, process_request: P
     )
 
     nlp_controller = NLPController(
-        vectordb_client=request.app.vectordb_client,
-        generation_client=request.app.generation_client,
-        embedding_client=request.app.embedding_client,
-        template_parser=request.app.template_parser,
+        vectordb_client=app.vectordb_client,
+        generation_client=app.generation_client,
+        embedding_client=app.embedding_client,
+        template_parser=app.template_parser,
+        embedding_cache=app.embedding_cache,
+        embedding_batcher=app.embedding_batcher,
+        query_coalescer=app.query_coalescer,
+        answer_cache=app.answer_cache,
     )
 
     asset_model = await AssetModel.create_instance(
-        db_client=request.app.db_client
+        db_client=app.db_client
     )
 
-    project_files_ids = {}
     if process_request.file_id:
         asset_record = await asset_model.get_asset_record(
             asset_project_id=project_id,
@@ -123,97 +191,268 @@ async def process_endpoint(request: Request, project_id: int, process_request: P
         )
 
         if asset_record is None:
-            return JSONResponse(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                content={
-                    "signal": ResponseSignal.FILE_ID_ERROR.value,
-                }
-            )
+            return status.HTTP_400_BAD_REQUEST, {
+                "signal": ResponseSignal.FILE_ID_ERROR.value,
+            }
 
-        project_files_ids = {
-            asset_record.asset_id: asset_record.asset_name
-        }
+        project_files = None
+        first_project_file = asset_record
 
     else:
 
-        project_files, total_pages = await asset_model.get_all_project_assets(
+        # assets are read from the cursor as processing goes; only the first one is fetched up front
+        project_files = asset_model.iter_project_assets(
             asset_project_id=project_id,
             asset_type=AssetTypeEnum.FILE.value,
         )
+        first_project_file = await anext(project_files, None)
 
-        project_files_ids = {
-            record.asset_id: record.asset_name
-            for record in project_files
+    if first_project_file is None:
+        return status.HTTP_400_BAD_REQUEST, {
+            "signal": ResponseSignal.NO_FILES_ERROR.value,
         }
 
-    if len(project_files_ids) == 0:
-        return JSONResponse(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            content={
-                "signal": ResponseSignal.NO_FILES_ERROR.value,
-            }
-        )
-
     process_controller = ProcessController(project_id=project_id)
 
     no_records = 0
     no_files = 0
 
     chunk_model = await ChunkModel.create_instance(
-        db_client=request.app.db_client
+        db_client=app.db_client
     )
 
     if do_reset == 1:
         # delete associated vectors collection
-        collection_name = nlp_controller.create_collection_name(project_id=project.project_id)
-        _ = await request.app.vectordb_client.delete_collection(collection_name=collection_name)
+        _ = await nlp_controller.reset_vector_db_collection(project=project)
 
         # delete associated chunks
         _ = await chunk_model.delete_chunks_by_project_id(
             project_id=project.project_id
         )
 
-    for asset_id, file_id in project_files_ids.items():
-
-        file_content = process_controller.get_file_content(file_id=file_id)
+        # recorded processing state no longer matches the (now empty) chunks
+        _ = await asset_model.reset_project_processing_state(
+            asset_project_id=project.project_id
+        )
 
-        if file_content is None:
-            logger.error(f"Error while processing file: {file_id}")
-            continue
-
-        file_chunks = process_controller.process_file_content(
-            file_content=file_content,
-            file_id=file_id,
-            chunk_size=chunk_size,
-            overlap_size=overlap_size
+    no_listed_files = 0
+    no_skipped_files = 0
+    has_deleted_vectors = False
+
+    async def iter_project_files():
+        yield first_project_file
+        if project_files is not None:
+            async for record in project_files:
+                yield record
+
+    async def iter_asset_groups():
+        """
+        Yield the assets to process as single-asset groups, in cursor order. Uploads of known content
+        reuse the existing asset, so a project holds one asset per content hash.
+        """
+        nonlocal no_listed_files, no_skipped_files, has_deleted_vectors
+
+        async for record in iter_project_files():
+            no_listed_files += 1
+
+            if do_incremental == 1 and do_reset != 1:
+                if not process_controller.is_processing_state_changed(
+                        asset_config=record.asset_config,
+                        asset_hash=record.asset_hash,
+                        chunk_size=chunk_size,
+                        overlap_size=overlap_size
+                ):
+                    no_skipped_files += 1
+                    continue
+
+                # replace only what this asset produced before: its vectors first (they reference chunks), then chunks
+                stale_chunks_ids = await chunk_model.get_asset_chunks_ids(asset_id=record.asset_id)
+                if len(stale_chunks_ids) > 0:
+                    _ = await nlp_controller.delete_from_vector_db(project=project, chunks_ids=stale_chunks_ids)
+                    _ = await chunk_model.delete_chunks_by_asset_id(asset_id=record.asset_id)
+                    has_deleted_vectors = True
+
+            yield [record]
+
+    async def record_processed_assets(asset_records: list, inserted_chunks: int, is_indexed: bool = False):
+        nonlocal no_records, no_files
+
+        for record in asset_records:
+            asset_config = dict(record.asset_config or {})
+            asset_config[AssetConfigEnum.PROCESSING.value] = process_controller.build_processing_state(
+                asset_hash=record.asset_hash,
+                chunk_size=chunk_size,
+                overlap_size=overlap_size,
+                is_indexed=is_indexed
+            )
+            _ = await asset_model.update_asset_config(asset_id=record.asset_id, asset_config=asset_config)
+
+        no_records += inserted_chunks
+        no_files += len(asset_records)
+
+        if report_progress is not None:
+            await report_progress({
+                "listed_files": no_listed_files,
+                "processed_files": no_files,
+                "skipped_files": no_skipped_files,
+                "inserted_chunks": no_records,
+            })
+
+    if do_index == 1:
+        # fused mode: chunks become searchable while later files are still being parsed
+        ingestion_controller = IngestionController(
+            process_controller=process_controller,
+            nlp_controller=nlp_controller,
+            chunk_model=chunk_model
         )
 
-        if file_chunks is None or len(file_chunks) == 0:
-            return JSONResponse(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                content={
-                    "signal": ResponseSignal.PROCESSING_FAILED.value
-                }
+        async def on_assets_ingested(asset_records: list, inserted_chunks: int):
+            await record_processed_assets(asset_records=asset_records, inserted_chunks=inserted_chunks,
+                                          is_indexed=True)
+
+        try:
+            _ = await ingestion_controller.ingest(
+                project=project,
+                asset_groups=iter_asset_groups(),
+                chunk_size=chunk_size,
+                overlap_size=overlap_size,
+                batch_size=app_settings.PROCESSING_STREAM_BATCH_SIZE,
+                queue_size=app_settings.PROCESSING_PIPELINE_QUEUE_SIZE,
+                max_parsers=app_settings.PROCESSING_MAX_WORKERS,
+                on_assets_ingested=on_assets_ingested
             )
+        except RuntimeError as e:
+            logger.error(f"Error while ingesting project: {project_id}: {e}")
+            return status.HTTP_400_BAD_REQUEST, {
+                "signal": ResponseSignal.PROCESSING_FAILED.value
+            }
+
+        return status.HTTP_200_OK, {
+            "signal": ResponseSignal.PROCESSING_SUCCESS.value,
+            "inserted_chunks": no_records,
+            "processed_files": no_files,
+            "skipped_files": no_skipped_files
+        }
+
+    # bound in-flight files to the pool size so the per-file timeout only covers processing time; a slot is
+    # held until its worker is really free, also after a timeout
+    pool_slots = asyncio.Semaphore(app_settings.PROCESSING_MAX_WORKERS)
 
+    async def insert_file_chunks(asset_ids: list, file_chunks: list, chunk_order_offset: int = 0):
         file_chunks_records = [
-            DataChunk(
-                chunk_text=chunk.page_content,
-                chunk_metadata=chunk.metadata,
-                chunk_order=i + 1,
-                chunk_project_id=project_id,
-                chunk_asset_id=asset_id
-            )
+            {
+                "chunk_text": chunk.page_content,
+                "chunk_metadata": chunk.metadata,
+                "chunk_order": chunk_order_offset + i + 1,
+                "chunk_project_id": project_id,
+                "chunk_asset_id": asset_id
+            }
+            for asset_id in asset_ids
             for i, chunk in enumerate(file_chunks)
         ]
 
-        no_records += await chunk_model.insert_many_chunks(chunks=file_chunks_records)
-        no_files += 1
+        return await chunk_model.bulk_insert_chunks(chunks=file_chunks_records)
 
-    return JSONResponse(
-        content={
-            "signal": ResponseSignal.PROCESSING_SUCCESS.value,
-            "inserted_chunks": no_records,
-            "processed_files": no_files
-        }
-    )
+    async def stream_asset(asset_ids: list, file_id: str, inserted_chunks_ids: list):
+        """Stream the file into chunks; ids are collected in `inserted_chunks_ids` as batches land."""
+        file_content = process_controller.get_file_content_iterator(file_id=file_id)
+        if file_content is None:
+            return None
+
+        file_chunks_count = 0
+        async for file_chunks in process_controller.stream_file_chunks(
+                file_content=file_content,
+                chunk_size=chunk_size,
+                overlap_size=overlap_size,
+                batch_size=app_settings.PROCESSING_STREAM_BATCH_SIZE
+        ):
+            inserted_chunks_ids.extend(await insert_file_chunks(
+                asset_ids=asset_ids,
+                file_chunks=file_chunks,
+                chunk_order_offset=file_chunks_count
+            ))
+            file_chunks_count += len(file_chunks)
+
+        return len(inserted_chunks_ids)
+
+    async def process_asset(asset_records: list):
+        asset_ids = [record.asset_id for record in asset_records]
+        file_id = asset_records[0].asset_name
+
+        # chunks a streamed file stored before failing; removed so the file is reported as failed cleanly
+        inserted_chunks_ids = []
+        try:
+            if do_stream == 1:
+                async with pool_slots:
+                    return asset_records, await asyncio.wait_for(
+                        stream_asset(asset_ids=asset_ids, file_id=file_id, inserted_chunks_ids=inserted_chunks_ids),
+                        timeout=app_settings.PROCESSING_FILE_TIMEOUT
+                    )
+
+            file_chunks = await process_controller.process_file_in_pool(
+                executor=app.process_pool,
+                file_id=file_id,
+                chunk_size=chunk_size,
+                overlap_size=overlap_size,
+                timeout=app_settings.PROCESSING_FILE_TIMEOUT,
+                pool_slots=pool_slots
+            )
+        except asyncio.TimeoutError:
+            logger.error(f"Timeout while processing file: {file_id}")
+            _ = await chunk_model.delete_chunks_by_ids(chunks_ids=inserted_chunks_ids)
+            return asset_records, None
+        except Exception as e:
+            logger.error(f"Error while processing file: {file_id}: {e}")
+            _ = await chunk_model.delete_chunks_by_ids(chunks_ids=inserted_chunks_ids)
+            return asset_records, None
+
+        if file_chunks is None:
+            return asset_records, None
+
+        return asset_records, len(await insert_file_chunks(asset_ids=asset_ids, file_chunks=file_chunks))
+
+    # a bounded window of files is in flight, so the cursor is read only as fast as files are processed
+    max_processing_tasks = 2 * app_settings.PROCESSING_MAX_WORKERS
+    asset_groups = iter_asset_groups()
+    processing_tasks = set()
+
+    try:
+        while True:
+            asset_records = await anext(asset_groups, None)
+            if asset_records is not None:
+                processing_tasks.add(asyncio.create_task(process_asset(asset_records=asset_records)))
+                if len(processing_tasks) < max_processing_tasks:
+                    continue
+
+            if len(processing_tasks) == 0:
+                break
+
+            done_tasks, processing_tasks = await asyncio.wait(processing_tasks,
+                                                              return_when=asyncio.FIRST_COMPLETED)
+            for processing_task in done_tasks:
+                asset_records, inserted_chunks = processing_task.result()
+
+                if inserted_chunks is None:
+                    logger.error(f"Error while processing file: {asset_records[0].asset_name}")
+                    continue
+
+                if inserted_chunks == 0:
+                    return status.HTTP_400_BAD_REQUEST, {
+                        "signal": ResponseSignal.PROCESSING_FAILED.value
+                    }
+
+                await record_processed_assets(asset_records=asset_records, inserted_chunks=inserted_chunks)
+    finally:
+        for processing_task in processing_tasks:
+            processing_task.cancel()
+
+        # answers cached from the deleted vectors; one index version bump for all replaced assets
+        if has_deleted_vectors:
+            await nlp_controller.invalidate_cached_answers(project=project)
+
+    return status.HTTP_200_OK, {
+        "signal": ResponseSignal.PROCESSING_SUCCESS.value,
+        "inserted_chunks": no_records,
+        "processed_files": no_files,
+        "skipped_files": no_skipped_files
+    }
@@ -0,0 +1,180 @@
+import logging
+
+from fastapi import APIRouter, Depends, status, Request
+from fastapi.responses import JSONResponse
+from helpers.config import get_settings, Settings
+from models.JobModel import JobModel
+from models.ProjectModel import ProjectModel
+from models.enums.JobEnums import JobTypeEnum
+from models.enums.ResponseEnums import ResponseSignal
+
+from .data import process_project_files
+from .nlp import push_project_index
+from .schemes.data import ProcessRequest
+from .schemes.nlp import PushRequest
+
+logger = logging.getLogger("uvicorn.error")
+
+jobs_router = APIRouter(
+    prefix="/api/v1/jobs",
+    tags=["api_v1", "jobs"],
+)
+
+
+def serialize_job(job):
+    return {
+        "job_id": job.job_id,
+        "job_uuid": str(job.job_uuid),
+        "job_type": job.job_type,
+        "job_status": job.job_status,
+        "job_project_id": job.job_project_id,
+        "job_params": job.job_params,
+        "job_progress": job.job_progress,
+        "job_result": job.job_result,
+        "job_error": job.job_error,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
+
+
+def raise_on_failure(status_code: int, content: dict):
+    if status_code != status.HTTP_200_OK:
+        raise RuntimeError(content["signal"])
+    return content
+
+
+@jobs_router.post("/process/{project_id}")
+async def submit_process_job(request: Request, project_id: int, process_request: ProcessRequest,
+                             app_settings: Settings = Depends(get_settings)):
+    app = request.app
+
+    # the job row references the project, so it must exist first
+    project_model = await ProjectModel.create_instance(db_client=app.db_client)
+    project = await project_model.get_project_or_create_one(project_id=project_id)
+    if project is None:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={
+                "signal": ResponseSignal.PROJECT_NOT_FOUND_ERROR.value
+            }
+        )
+
+    async def run_process_job(report_progress):
+        status_code, content = await process_project_files(
+            app=app,
+            project_id=project_id,
+            process_request=process_request,
+            app_settings=app_settings,
+            report_progress=report_progress
+        )
+        return raise_on_failure(status_code=status_code, content=content)
+
+    job = await app.job_runner.submit(
+        job_type=JobTypeEnum.PROCESS.value,
+        job_fn=run_process_job,
+        project_id=project_id,
+        job_params=process_request.dict()
+    )
+
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content={
+            "signal": ResponseSignal.JOB_SUBMITTED.value,
+            "job_id": job.job_id
+        }
+    )
+
+
+@jobs_router.post("/index/push/{project_id}")
+async def submit_index_push_job(request: Request, project_id: int, push_request: PushRequest,
+                                app_settings: Settings = Depends(get_settings)):
+    app = request.app
+
+    # the job row references the project, so it must exist first
+    project_model = await ProjectModel.create_instance(db_client=app.db_client)
+    project = await project_model.get_project_or_create_one(project_id=project_id)
+    if project is None:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={
+                "signal": ResponseSignal.PROJECT_NOT_FOUND_ERROR.value
+            }
+        )
+
+    async def run_index_push_job(report_progress):
+        status_code, content = await push_project_index(
+            app=app,
+            project_id=project_id,
+            push_request=push_request,
+            app_settings=app_settings,
+            report_progress=report_progress
+        )
+        return raise_on_failure(status_code=status_code, content=content)
+
+    job = await app.job_runner.submit(
+        job_type=JobTypeEnum.INDEX_PUSH.value,
+        job_fn=run_index_push_job,
+        project_id=project_id,
+        job_params=push_request.dict()
+    )
+
+    return JSONResponse(
+        status_code=status.HTTP_202_ACCEPTED,
+        content={
+            "signal": ResponseSignal.JOB_SUBMITTED.value,
+            "job_id": job.job_id
+        }
+    )
+
+
+@jobs_router.get("/{job_id}")
+async def get_job_status(request: Request, job_id: int):
+    job_model = await JobModel.create_instance(db_client=request.app.db_client)
+    job = await job_model.get_job(job_id=job_id)
+
+    if job is None:
+        return JSONResponse(
+            status_code=status.HTTP_404_NOT_FOUND,
+            content={
+                "signal": ResponseSignal.JOB_NOT_FOUND_ERROR.value
+            }
+        )
+
+    return JSONResponse(
+        content={
+            "signal": ResponseSignal.JOB_RETRIEVED.value,
+            "job": serialize_job(job)
+        }
+    )
+
+
+@jobs_router.post("/{job_id}/cancel")
+async def cancel_job(request: Request, job_id: int):
+    job_model = await JobModel.create_instance(db_client=request.app.db_client)
+    job = await job_model.get_job(job_id=job_id)
+
+    if job is None:
+        return JSONResponse(
+            status_code=status.HTTP_404_NOT_FOUND,
+            content={
+                "signal": ResponseSignal.JOB_NOT_FOUND_ERROR.value
+            }
+        )
+
+    is_requested = await request.app.job_runner.cancel(job_id=job_id)
+    if not is_requested:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={
+                "signal": ResponseSignal.JOB_NOT_CANCELLABLE_ERROR.value,
+                "job_status": job.job_status
+            }
+        )
+
+    return JSONResponse(
+        content={
+            "signal": ResponseSignal.JOB_CANCEL_REQUESTED.value,
+            "job_id": job_id
+        }
+    )
@@ -1,12 +1,16 @@
+import json
 import logging
 
 from controllers.NLPController import NLPController
-from fastapi import APIRouter, status, Request
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, status, Request, Depends
+from fastapi.responses import JSONResponse, StreamingResponse
+from helpers.config import get_settings, Settings
+from models.AssetModel import AssetModel
 from models.ChunkModel import ChunkModel
 from models.ProjectModel import ProjectModel
 from models.enums.ResponseEnums import ResponseSignal
-from routes.schemes.nlp import PushRequest, SearchRequest
+from models.enums.StreamEventEnum import StreamEventEnum
+from routes.schemes.nlp import PushRequest, SearchRequest, RecallRequest, IndexRebuildRequest
 from tqdm.auto import tqdm
 
 logger = logging.getLogger("uvicorn.error")
@@ -18,13 +22,34 @@ nlp_router = APIRouter(
 
 
 @nlp_router.post("/index/push/{project_id}")
-async def index_project(request: Request, project_id: int, push_request: PushRequest):
+async def index_project(request: Request, project_id: int, push_request: PushRequest,
+                        app_settings: Settings = Depends(get_settings)):
+    status_code, content = await push_project_index(
+        app=request.app,
+        project_id=project_id,
+        push_request=push_request,
+        app_settings=app_settings
+    )
+
+    return JSONResponse(status_code=status_code, content=content)
+
+
+async def push_project_index(app, project_id: int, push_request: PushRequest, app_settings: Settings,
+                             report_progress=None):
+    """
+    Body of /index/push, shared with the background job runner.
+    Returns the response status code and content; `report_progress` is awaited with progress dicts.
+    """
     project_model = await ProjectModel.create_instance(
-        db_client=request.app.db_client
+        db_client=app.db_client
     )
 
     chunk_model = await ChunkModel.create_instance(
-        db_client=request.app.db_client
+        db_client=app.db_client
+    )
+
+    asset_model = await AssetModel.create_instance(
+        db_client=app.db_client
     )
 
     project = await project_model.get_project_or_create_one(
@@ -32,73 +57,78 @@ async def index_project(request: Request, project_id: int, push_request: PushReq
     )
 
     if not project:
-        return JSONResponse(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            content={
-                "signal": ResponseSignal.PROJECT_NOT_FOUND_ERROR.value
-            }
-        )
+        return status.HTTP_400_BAD_REQUEST, {
+            "signal": ResponseSignal.PROJECT_NOT_FOUND_ERROR.value
+        }
 
     nlp_controller = NLPController(
-        vectordb_client=request.app.vectordb_client,
-        generation_client=request.app.generation_client,
-        embedding_client=request.app.embedding_client,
-        template_parser=request.app.template_parser,
+        vectordb_client=app.vectordb_client,
+        generation_client=app.generation_client,
+        embedding_client=app.embedding_client,
+        template_parser=app.template_parser,
+        embedding_cache=app.embedding_cache,
+        embedding_batcher=app.embedding_batcher,
+        query_coalescer=app.query_coalescer,
+        answer_cache=app.answer_cache,
     )
 
-    has_records = True
-    page_no = 1
     inserted_items_count = 0
     idx = 0
 
     # create collection if not exists
-    collection_name = nlp_controller.create_collection_name(project_id=project.project_id)
+    _ = await nlp_controller.create_vector_db_collection(project=project, do_reset=push_request.do_reset)
 
-    _ = await request.app.vectordb_client.create_collection(
-        collection_name=collection_name,
-        embedding_size=request.app.embedding_client.embedding_size,
-        do_reset=push_request.do_reset,
-    )
+    # assets processed since the last push; in incremental mode only their chunks are indexed
+    pending_asset_ids = await asset_model.get_project_assets_pending_index(asset_project_id=project.project_id)
+    indexed_asset_ids = None
+    if push_request.do_incremental == 1 and push_request.do_reset != 1:
+        indexed_asset_ids = pending_asset_ids
 
     # setup batching
-    total_chunks_count = await chunk_model.get_total_chunks_count(project_id=project.project_id)
+    total_chunks_count = await chunk_model.get_total_chunks_count(project_id=project.project_id,
+                                                                  asset_ids=indexed_asset_ids)
     pbar = tqdm(total=total_chunks_count, desc="Vector Indexing", position=0)
 
-    while has_records:
-        page_chunks = await chunk_model.get_poject_chunks(project_id=project.project_id, page_no=page_no)
-        if len(page_chunks):
-            page_no += 1
-
-        if not page_chunks or len(page_chunks) == 0:
-            has_records = False
-            break
-
-        chunks_ids = [c.chunk_id for c in page_chunks]
-        idx += len(page_chunks)
-
-        is_inserted = await nlp_controller.index_into_vector_db(
-            project=project,
-            chunks=page_chunks,
-            chunks_ids=chunks_ids
-        )
+    # the vector index is built once after the load; a reset (empty) collection loads without one
+    _ = await nlp_controller.start_vector_db_bulk_load(project=project, drop_index=push_request.do_reset == 1)
+
+    try:
+        # large pages let the embedding batcher run several provider requests concurrently
+        async for page_chunks in chunk_model.iter_project_chunks_batches(
+                project_id=project.project_id,
+                batch_size=app_settings.INDEX_PUSH_PAGE_SIZE,
+                asset_ids=indexed_asset_ids):
+            chunks_ids = [c.chunk_id for c in page_chunks]
+            idx += len(page_chunks)
+
+            is_inserted = await nlp_controller.index_into_vector_db(
+                project=project,
+                chunks=page_chunks,
+                chunks_ids=chunks_ids
+            )
 
-        if not is_inserted:
-            return JSONResponse(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                content={
+            if not is_inserted:
+                return status.HTTP_400_BAD_REQUEST, {
                     "signal": ResponseSignal.INSERT_INTO_VECTORDB_ERROR.value
                 }
-            )
 
-        pbar.update(len(page_chunks))
-        inserted_items_count += len(page_chunks)
+            pbar.update(len(page_chunks))
+            inserted_items_count += len(page_chunks)
 
-    return JSONResponse(
-        content={
-            "signal": ResponseSignal.INSERT_INTO_VECTORDB_SUCCESS.value,
-            "inserted_items_count": inserted_items_count
-        }
-    )
+            if report_progress is not None:
+                await report_progress({
+                    "total_chunks_count": total_chunks_count,
+                    "inserted_items_count": inserted_items_count,
+                })
+    finally:
+        _ = await nlp_controller.finish_vector_db_bulk_load(project=project)
+
+    _ = await asset_model.mark_assets_indexed(asset_ids=pending_asset_ids)
+
+    return status.HTTP_200_OK, {
+        "signal": ResponseSignal.INSERT_INTO_VECTORDB_SUCCESS.value,
+        "inserted_items_count": inserted_items_count
+    }
 
 
 @nlp_router.get("/index/info/{project_id}")
@@ -117,7 +147,11 @@ async def get_project_index_info(request: Request, project_id: int):
         vectordb_client=request.app.vectordb_client,
         generation_client=request.app.generation_client,
         embedding_client=request.app.embedding_client,
-        template_parser=request.app.template_parser
+        template_parser=request.app.template_parser,
+        embedding_cache=request.app.embedding_cache,
+        embedding_batcher=request.app.embedding_batcher,
+        query_coalescer=request.app.query_coalescer,
+        answer_cache=request.app.answer_cache
     )
 
     collection_info = await nlp_controller.get_vector_db_collection_info(project=project)
@@ -125,7 +159,9 @@ async def get_project_index_info(request: Request, project_id: int):
         status_code=status.HTTP_200_OK,
         content={
             "signal": ResponseSignal.VECTORDB_COLLECTION_RETRIEVED.value,
-            "collection_info": collection_info
+            "collection_info": collection_info,
+            "embedding_cache": request.app.embedding_cache.get_stats(),
+            "answer_cache": request.app.answer_cache.get_stats()
         }
     )
 
@@ -147,13 +183,19 @@ async def search_index(request: Request, project_id: int, search_request: Search
         vectordb_client=request.app.vectordb_client,
         generation_client=request.app.generation_client,
         embedding_client=request.app.embedding_client,
-        template_parser=request.app.template_parser
+        template_parser=request.app.template_parser,
+        embedding_cache=request.app.embedding_cache,
+        embedding_batcher=request.app.embedding_batcher,
+        query_coalescer=request.app.query_coalescer,
+        answer_cache=request.app.answer_cache
     )
 
     results = await nlp_controller.search_vector_db_collection(
         project=project,
         text=search_request.text,
-        limit=search_request.limit
+        limit=search_request.limit,
+        ef_search=search_request.ef_search,
+        probes=search_request.probes
     )
 
     if not results:
@@ -173,8 +215,148 @@ async def search_index(request: Request, project_id: int, search_request: Search
     )
 
 
+@nlp_router.post("/index/search/explain/{project_id}")
+async def explain_search_index(request: Request, project_id: int, search_request: SearchRequest):
+    project_model = await ProjectModel.create_instance(db_client=request.app.db_client)
+    project = await project_model.get_project_or_create_one(project_id=project_id)
+    if project is None:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={
+                "signal": ResponseSignal.PROJECT_NOT_FOUND_ERROR.value
+            }
+        )
+
+    nlp_controller = NLPController(
+        vectordb_client=request.app.vectordb_client,
+        generation_client=request.app.generation_client,
+        embedding_client=request.app.embedding_client,
+        template_parser=request.app.template_parser,
+        embedding_cache=request.app.embedding_cache,
+        embedding_batcher=request.app.embedding_batcher,
+        query_coalescer=request.app.query_coalescer,
+        answer_cache=request.app.answer_cache
+    )
+
+    search_plan = await nlp_controller.explain_vector_db_search(
+        project=project,
+        text=search_request.text,
+        limit=search_request.limit,
+        ef_search=search_request.ef_search,
+        probes=search_request.probes
+    )
+
+    if not search_plan:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={
+                "signal": ResponseSignal.VECTORDB_SEARCH_FAILED.value
+            }
+        )
+
+    return JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={
+            "signal": ResponseSignal.VECTORDB_SEARCH_EXPLAINED.value,
+            "search_plan": search_plan
+        }
+    )
+
+
+@nlp_router.post("/index/rebuild/{project_id}")
+async def rebuild_project_index(request: Request, project_id: int, rebuild_request: IndexRebuildRequest):
+    project_model = await ProjectModel.create_instance(db_client=request.app.db_client)
+    project = await project_model.get_project_or_create_one(project_id=project_id)
+    if project is None:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={
+                "signal": ResponseSignal.PROJECT_NOT_FOUND_ERROR.value
+            }
+        )
+
+    nlp_controller = NLPController(
+        vectordb_client=request.app.vectordb_client,
+        generation_client=request.app.generation_client,
+        embedding_client=request.app.embedding_client,
+        template_parser=request.app.template_parser,
+        embedding_cache=request.app.embedding_cache,
+        embedding_batcher=request.app.embedding_batcher,
+        query_coalescer=request.app.query_coalescer,
+        answer_cache=request.app.answer_cache
+    )
+
+    # the collection is missing, below VECTOR_DB_PGVEC_INDEX_THRESHOLD or the build failed
+    is_rebuilt = await nlp_controller.rebuild_vector_db_index(project=project,
+                                                             index_type=rebuild_request.index_type)
+    if not is_rebuilt:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={
+                "signal": ResponseSignal.VECTORDB_INDEX_REBUILD_SKIPPED.value
+            }
+        )
+
+    return JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={
+            "signal": ResponseSignal.VECTORDB_INDEX_REBUILT.value
+        }
+    )
+
+
+@nlp_router.post("/index/recall/{project_id}")
+async def evaluate_index_recall(request: Request, project_id: int, recall_request: RecallRequest):
+    project_model = await ProjectModel.create_instance(db_client=request.app.db_client)
+    project = await project_model.get_project_or_create_one(project_id=project_id)
+    if project is None:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={
+                "signal": ResponseSignal.PROJECT_NOT_FOUND_ERROR.value
+            }
+        )
+
+    nlp_controller = NLPController(
+        vectordb_client=request.app.vectordb_client,
+        generation_client=request.app.generation_client,
+        embedding_client=request.app.embedding_client,
+        template_parser=request.app.template_parser,
+        embedding_cache=request.app.embedding_cache,
+        embedding_batcher=request.app.embedding_batcher,
+        query_coalescer=request.app.query_coalescer,
+        answer_cache=request.app.answer_cache
+    )
+
+    recall = await nlp_controller.evaluate_search_recall(
+        project=project,
+        queries=recall_request.queries,
+        limit=recall_request.limit,
+        ef_search=recall_request.ef_search,
+        probes=recall_request.probes
+    )
+
+    if recall is None:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={
+                "signal": ResponseSignal.VECTORDB_SEARCH_FAILED.value
+            }
+        )
+
+    return JSONResponse(
+        status_code=status.HTTP_200_OK,
+        content={
+            "signal": ResponseSignal.VECTORDB_RECALL_EVALUATED.value,
+            "quantization": request.app.vectordb_client.quantization,
+            "recall": recall
+        }
+    )
+
+
 @nlp_router.post("/index/answer/{project_id}")
-async def answer_rag(request: Request, project_id: int, search_request: SearchRequest):
+async def answer_rag(request: Request, project_id: int, search_request: SearchRequest,
+                     app_settings: Settings = Depends(get_settings)):
     project_model = await ProjectModel.create_instance(db_client=request.app.db_client)
     project = await project_model.get_project_or_create_one(project_id=project_id)
     if project is None:
@@ -189,7 +371,13 @@ async def answer_rag(request: Request, project_id: int, search_request: SearchRe
         vectordb_client=request.app.vectordb_client,
         generation_client=request.app.generation_client,
         embedding_client=request.app.embedding_client,
-        template_parser=request.app.template_parser
+        template_parser=request.app.template_parser,
+        embedding_cache=request.app.embedding_cache,
+        embedding_batcher=request.app.embedding_batcher,
+        query_coalescer=request.app.query_coalescer,
+        answer_cache=request.app.answer_cache,
+        token_counter=request.app.token_counter,
+        context_max_tokens=app_settings.GENERATION_CONTEXT_MAX_TOKENS
     )
 
     answer, full_prompt, chat_history = await nlp_controller.answer_rag_question(
@@ -215,3 +403,88 @@ async def answer_rag(request: Request, project_id: int, search_request: SearchRe
             "chat_history": chat_history
         }
     )
+
+
+def format_sse_event(event: str, data: dict):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@nlp_router.post("/index/answer/stream/{project_id}")
+async def answer_rag_stream(request: Request, project_id: int, search_request: SearchRequest,
+                            app_settings: Settings = Depends(get_settings)):
+    """
+    Server-Sent Events variant of /index/answer: a `sources` event with the retrieved documents,
+    one `token` event per generated text delta, then `done` (or `error`).
+    """
+    project_model = await ProjectModel.create_instance(db_client=request.app.db_client)
+    project = await project_model.get_project_or_create_one(project_id=project_id)
+    if project is None:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={
+                "signal": ResponseSignal.PROJECT_NOT_FOUND_ERROR.value
+            }
+        )
+
+    nlp_controller = NLPController(
+        vectordb_client=request.app.vectordb_client,
+        generation_client=request.app.generation_client,
+        embedding_client=request.app.embedding_client,
+        template_parser=request.app.template_parser,
+        embedding_cache=request.app.embedding_cache,
+        embedding_batcher=request.app.embedding_batcher,
+        query_coalescer=request.app.query_coalescer,
+        answer_cache=request.app.answer_cache,
+        token_counter=request.app.token_counter,
+        context_max_tokens=app_settings.GENERATION_CONTEXT_MAX_TOKENS
+    )
+
+    retrieved_documents, answer_stream, full_prompt, chat_history = await nlp_controller.answer_rag_question_stream(
+        project=project,
+        query=search_request.text,
+        limit=search_request.limit
+    )
+
+    if not retrieved_documents:
+        return JSONResponse(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={
+                "signal": ResponseSignal.RAG_ANSWER_FAILED.value
+            }
+        )
+
+    async def stream_events():
+        yield format_sse_event(StreamEventEnum.SOURCES.value, {
+            "sources": [doc.dict() for doc in retrieved_documents]
+        })
+
+        answer_parts = []
+        try:
+            async for text in answer_stream:
+                answer_parts.append(text)
+                yield format_sse_event(StreamEventEnum.TOKEN.value, {"text": text})
+        except Exception as e:
+            logger.error(f"Error while streaming RAG answer: {e}")
+            yield format_sse_event(StreamEventEnum.ERROR.value, {
+                "signal": ResponseSignal.RAG_ANSWER_FAILED.value
+            })
+            return
+
+        if not answer_parts:
+            yield format_sse_event(StreamEventEnum.ERROR.value, {
+                "signal": ResponseSignal.RAG_ANSWER_FAILED.value
+            })
+            return
+
+        yield format_sse_event(StreamEventEnum.DONE.value, {
+            "signal": ResponseSignal.RAG_ANSWER_SUCCESS.value,
+            "answer": "".join(answer_parts),
+            "full_prompt": full_prompt,
+            "chat_history": chat_history
+        })
+
+    return StreamingResponse(
+        stream_events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -8,3 +8,6 @@ class ProcessRequest(BaseModel):
     chunk_size: Optional[int] = 100
     overlap_size: Optional[int] = 20
     do_reset: Optional[int] = 0
+    do_stream: Optional[int] = 0
+    do_incremental: Optional[int] = 0
+    do_index: Optional[int] = 0
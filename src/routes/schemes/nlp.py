@@ -1,12 +1,26 @@
-from typing import Optional
+from typing import List, Optional
 
 from pydantic import BaseModel
 
 
 class PushRequest(BaseModel):
     do_reset: Optional[int] = 0
+    do_incremental: Optional[int] = 0
 
 
 class SearchRequest(BaseModel):
     text: str
     limit: Optional[int] = 5
+    ef_search: Optional[int] = None
+    probes: Optional[int] = None
+
+
+class IndexRebuildRequest(BaseModel):
+    index_type: Optional[str] = None
+
+
+class RecallRequest(BaseModel):
+    queries: List[str]
+    limit: Optional[int] = 10
+    ef_search: Optional[int] = None
+    probes: Optional[int] = None
@@ -0,0 +1,98 @@
+import asyncio
+import contextlib
+import logging
+import random
+from typing import List
+
+from .LLMEnums import DocumentTypeEnum
+from .LLMInterface import LLMRateLimitError
+
+
+class EmbeddingBatcher:
+    """
+    Splits embedding inputs into provider-sized batches and embeds them concurrently.
+
+    Batches respect the provider's `max_embedding_batch_size` and `max_embedding_batch_tokens`
+    (tokens are estimated as ~4 characters each). At most `max_concurrency` document requests are in
+    flight across the whole process (queries are not held behind them), and rate-limited batches are
+    retried with full-jitter exponential backoff.
+    """
+
+    def __init__(self, embedding_client, max_concurrency: int = 4, max_retries: int = 5,
+                 backoff_base: float = 1.0, backoff_max: float = 30.0):
+        self.embedding_client = embedding_client
+        self.request_slots = asyncio.Semaphore(max_concurrency)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self.logger = logging.getLogger("uvicorn.error")
+
+    @staticmethod
+    def estimate_tokens(text: str):
+        return len(text) // 4 + 1
+
+    def split_batches(self, texts: List[str]):
+        max_batch_size = getattr(self.embedding_client, "max_embedding_batch_size", None)
+        max_batch_tokens = getattr(self.embedding_client, "max_embedding_batch_tokens", None)
+
+        batches, batch, batch_tokens = [], [], 0
+        for text in texts:
+            text_tokens = self.estimate_tokens(text)
+
+            is_full = max_batch_size is not None and len(batch) >= max_batch_size
+            is_over_budget = max_batch_tokens is not None and batch_tokens + text_tokens > max_batch_tokens
+            if batch and (is_full or is_over_budget):
+                batches.append(batch)
+                batch, batch_tokens = [], 0
+
+            batch.append(text)
+            batch_tokens += text_tokens
+
+        if batch:
+            batches.append(batch)
+
+        return batches
+
+    async def _embed_batch(self, texts: List[str], document_type: str):
+        for attempt in range(self.max_retries + 1):
+            request_slots = self.request_slots
+            if document_type == DocumentTypeEnum.QUERY.value:
+                request_slots = contextlib.nullcontext()
+
+            try:
+                async with request_slots:
+                    return await self.embedding_client.embed_text(text=texts, document_type=document_type)
+            except LLMRateLimitError as e:
+                if attempt == self.max_retries:
+                    self.logger.error(f"Embedding batch still rate limited after {attempt} retries")
+                    return None
+
+                delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+                if e.retry_after is not None:
+                    delay = max(delay, e.retry_after)
+
+                self.logger.warning(f"Embedding batch rate limited, retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+
+        return None
+
+    async def embed_text(self, text: List[str], document_type: str = None):
+        """Same contract as `LLMInterface.embed_text`: the vectors in input order, or None on failure."""
+        texts = [text] if isinstance(text, str) else text
+        batches = self.split_batches(texts)
+        if not batches:
+            return None
+
+        results = await asyncio.gather(*[
+            self._embed_batch(texts=batch, document_type=document_type)
+            for batch in batches
+        ])
+
+        vectors = []
+        for batch, batch_vectors in zip(batches, results):
+            if not batch_vectors or len(batch_vectors) != len(batch):
+                return None
+            vectors.extend(batch_vectors)
+
+        return vectors
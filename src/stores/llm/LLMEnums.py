@@ -4,6 +4,8 @@ from enum import Enum
 class LLMEnums(Enum):
     OPENAI = "OPENAI"
     COHERE = "COHERE"
+    LOCAL = "LOCAL"
+    FAKE = "FAKE"
 
 
 class OpenAIEnums(Enum):
@@ -24,3 +26,8 @@ class CoHereEnums(Enum):
 class DocumentTypeEnum(Enum):
     DOCUMENT = "document"
     QUERY = "query"
+
+
+class LLMRequestPriorityEnum(Enum):
+    INTERACTIVE = 0
+    BULK = 1
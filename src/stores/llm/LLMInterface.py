@@ -1,6 +1,14 @@
 from abc import ABC, abstractmethod
 
 
+class LLMRateLimitError(Exception):
+    """Raised by providers when the backend rejects a request with a rate limit (HTTP 429)."""
+
+    def __init__(self, message: str = None, retry_after: float = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
 class LLMInterface(ABC):
 
     @abstractmethod
@@ -12,12 +20,18 @@ class LLMInterface(ABC):
         pass
 
     @abstractmethod
-    def generate_text(self, prompt: str, chat_history: list = [],
-                      max_output_tokens: int = None, temperature: float = None):
+    async def generate_text(self, prompt: str, chat_history: list = [],
+                            max_output_tokens: int = None, temperature: float = None):
+        pass
+
+    @abstractmethod
+    async def generate_text_stream(self, prompt: str, chat_history: list = [],
+                                   max_output_tokens: int = None, temperature: float = None):
+        """Async generator yielding the completion text deltas as they arrive."""
         pass
 
     @abstractmethod
-    def embed_text(self, text: str, document_type: str = None):
+    async def embed_text(self, text: str, document_type: str = None):
         pass
 
     @abstractmethod
@@ -1,11 +1,36 @@
+import httpx
+
 from .LLMEnums import LLMEnums
-from .providers import OpenAIProvider, CoHereProvider
+from .RateLimiter import RateLimiter
+from .providers import OpenAIProvider, CoHereProvider, LocalProvider, FakeProvider
 
 
 class LLMProviderFactory:
     def __init__(self, config: dict):
         self.config = config
 
+        # one keep-alive connection pool shared by every HTTP provider client
+        self.http_client = httpx.AsyncClient(
+            http2=self.config.LLM_HTTP2,
+            timeout=httpx.Timeout(self.config.LLM_HTTP_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=self.config.LLM_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=self.config.LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=self.config.LLM_HTTP_KEEPALIVE_EXPIRY,
+            ),
+        )
+
+        # one limiter per provider, shared by its generation and embedding clients
+        self.rate_limiters = {}
+
+    def get_rate_limiter(self, provider: str):
+        if provider not in self.rate_limiters:
+            self.rate_limiters[provider] = RateLimiter(
+                requests_per_minute=self.config.LLM_RATE_LIMIT_RPM,
+                tokens_per_minute=self.config.LLM_RATE_LIMIT_TPM,
+            )
+        return self.rate_limiters[provider]
+
     def create(self, provider: str):
         if provider == LLMEnums.OPENAI.value:
             return OpenAIProvider(
@@ -15,7 +40,9 @@ class LLMProviderFactory:
                 generation_api_url=self.config.GENERATION_API_URL,
                 default_input_max_tokens=self.config.INPUT_DEFAULT_MAX_SIZE,
                 default_generation_max_output_tokens=self.config.GENERATION_DEFAULT_MAX_TOKENS,
-                default_generation_temperature=self.config.GENERATION_DEFAULT_TEMPERATURE
+                default_generation_temperature=self.config.GENERATION_DEFAULT_TEMPERATURE,
+                http_client=self.http_client,
+                rate_limiter=self.get_rate_limiter(provider)
             )
 
         if provider == LLMEnums.COHERE.value:
@@ -26,6 +53,28 @@ class LLMProviderFactory:
                 generation_api_url=self.config.GENERATION_API_URL,
                 default_input_max_tokens=self.config.INPUT_DEFAULT_MAX_SIZE,
                 default_generation_max_output_tokens=self.config.GENERATION_DEFAULT_MAX_TOKENS,
+                default_generation_temperature=self.config.GENERATION_DEFAULT_TEMPERATURE,
+                http_client=self.http_client,
+                rate_limiter=self.get_rate_limiter(provider)
+            )
+
+        if provider == LLMEnums.LOCAL.value:
+            return LocalProvider(
+                model_path=self.config.EMBEDDING_LOCAL_MODEL_PATH,
+                max_length=self.config.EMBEDDING_LOCAL_MAX_LENGTH,
+                batch_size=self.config.EMBEDDING_LOCAL_BATCH_SIZE,
+                num_threads=self.config.EMBEDDING_LOCAL_NUM_THREADS,
+                max_workers=self.config.EMBEDDING_LOCAL_MAX_WORKERS,
+                default_input_max_tokens=self.config.INPUT_DEFAULT_MAX_SIZE
+            )
+
+        if provider == LLMEnums.FAKE.value:
+            return FakeProvider(
+                latency_ms=self.config.FAKE_LLM_LATENCY_MS,
+                jitter_ms=self.config.FAKE_LLM_JITTER_MS,
+                error_rate=self.config.FAKE_LLM_ERROR_RATE,
+                default_input_max_tokens=self.config.INPUT_DEFAULT_MAX_SIZE,
+                default_generation_max_output_tokens=self.config.GENERATION_DEFAULT_MAX_TOKENS,
                 default_generation_temperature=self.config.GENERATION_DEFAULT_TEMPERATURE
             )
 
@@ -0,0 +1,82 @@
+import asyncio
+import logging
+from typing import List
+
+from .LLMEnums import DocumentTypeEnum
+
+
+class QueryEmbeddingCoalescer:
+    """
+    Micro-batches concurrent query embeddings.
+
+    The first query of a batch opens a `window_ms` window; every query arriving meanwhile joins it,
+    and the batch is sent as one embedding request when the window closes or `max_batch_size` is reached.
+    Each caller then gets its own vector back. Identical concurrent queries share one input.
+    """
+
+    def __init__(self, embedding_client, window_ms: int = 5, max_batch_size: int = 64):
+        self.embedding_client = embedding_client
+        self.window_ms = window_ms
+        self.max_batch_size = max_batch_size
+
+        self.pending = {}
+        self.flush_handle = None
+        self.flush_tasks = set()
+
+        self.logger = logging.getLogger("uvicorn.error")
+
+    def _schedule_flush(self):
+        loop = asyncio.get_running_loop()
+        self.flush_handle = loop.call_later(self.window_ms / 1000, self._flush)
+
+    def _flush(self):
+        if self.flush_handle is not None:
+            self.flush_handle.cancel()
+            self.flush_handle = None
+
+        batch, self.pending = self.pending, {}
+        if batch:
+            task = asyncio.create_task(self._embed_batch(batch))
+            self.flush_tasks.add(task)
+            task.add_done_callback(self.flush_tasks.discard)
+
+    async def _embed_batch(self, batch: dict):
+        texts = list(batch.keys())
+        try:
+            vectors = await self.embedding_client.embed_text(text=texts,
+                                                             document_type=DocumentTypeEnum.QUERY.value)
+        except Exception as e:
+            self.logger.error(f"Error while embedding a batch of {len(texts)} queries: {e}")
+            vectors = None
+
+        if not vectors or len(vectors) != len(texts):
+            vectors = [None] * len(texts)
+
+        for text, vector in zip(texts, vectors):
+            future = batch[text]
+            if not future.done():
+                future.set_result(vector)
+
+    async def embed_query(self, text: str):
+        future = self.pending.get(text)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self.pending[text] = future
+
+            if len(self.pending) >= self.max_batch_size:
+                self._flush()
+            elif self.flush_handle is None:
+                self._schedule_flush()
+
+        # shield the shared future, so one cancelled request does not fail the others waiting on it
+        return await asyncio.shield(future)
+
+    async def embed_text(self, text: List[str], document_type: str = None):
+        """Same contract as `LLMInterface.embed_text`, for query embeddings only."""
+        texts = [text] if isinstance(text, str) else text
+        vectors = await asyncio.gather(*[self.embed_query(t) for t in texts])
+
+        if any(v is None for v in vectors):
+            return None
+
+        return list(vectors)
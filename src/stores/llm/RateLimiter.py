@@ -0,0 +1,99 @@
+import asyncio
+import heapq
+import itertools
+import time
+from typing import List
+
+from .LLMEnums import LLMRequestPriorityEnum
+
+
+class RateLimiter:
+    """
+    Token-bucket limiter on requests/min and tokens/min for one LLM provider.
+
+    Both buckets refill continuously and start full. Callers wait in a priority queue, so queued
+    interactive requests (queries, answers) always go before bulk document embeddings; within a
+    priority class the order is FIFO. A limit of 0 disables that bucket.
+    """
+
+    def __init__(self, requests_per_minute: int = 0, tokens_per_minute: int = 0):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+
+        self.available_requests = float(requests_per_minute)
+        self.available_tokens = float(tokens_per_minute)
+        self.refilled_at = time.monotonic()
+
+        self.waiters = []
+        self.waiters_order = itertools.count()
+        self.dispatch_handle = None
+
+    @property
+    def is_enabled(self):
+        return self.requests_per_minute > 0 or self.tokens_per_minute > 0
+
+    @staticmethod
+    def estimate_tokens(texts: List[str]):
+        return sum(len(t) // 4 + 1 for t in texts)
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed_minutes = (now - self.refilled_at) / 60
+        self.refilled_at = now
+
+        if self.requests_per_minute > 0:
+            self.available_requests = min(self.requests_per_minute,
+                                          self.available_requests + elapsed_minutes * self.requests_per_minute)
+        if self.tokens_per_minute > 0:
+            self.available_tokens = min(self.tokens_per_minute,
+                                        self.available_tokens + elapsed_minutes * self.tokens_per_minute)
+
+    def _wait_seconds(self, tokens: int):
+        wait_minutes = 0.0
+        if self.requests_per_minute > 0 and self.available_requests < 1:
+            wait_minutes = max(wait_minutes, (1 - self.available_requests) / self.requests_per_minute)
+        if self.tokens_per_minute > 0 and self.available_tokens < tokens:
+            wait_minutes = max(wait_minutes, (tokens - self.available_tokens) / self.tokens_per_minute)
+        return wait_minutes * 60
+
+    def _dispatch(self):
+        self.dispatch_handle = None
+        self._refill()
+
+        while self.waiters:
+            _, _, tokens, future = self.waiters[0]
+            if future.done():
+                heapq.heappop(self.waiters)
+                continue
+
+            wait_seconds = self._wait_seconds(tokens)
+            if wait_seconds > 0:
+                self.dispatch_handle = asyncio.get_running_loop().call_later(wait_seconds, self._dispatch)
+                return
+
+            if self.requests_per_minute > 0:
+                self.available_requests -= 1
+            if self.tokens_per_minute > 0:
+                self.available_tokens -= tokens
+
+            heapq.heappop(self.waiters)
+            future.set_result(None)
+
+    async def acquire(self, tokens: int = 1,
+                      priority: int = LLMRequestPriorityEnum.BULK.value):
+        if not self.is_enabled:
+            return
+
+        # a request larger than the whole bucket would never fit; let it drain the bucket instead
+        if self.tokens_per_minute > 0:
+            tokens = min(tokens, self.tokens_per_minute)
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self.waiters, (priority, next(self.waiters_order), tokens, future))
+
+        if self.dispatch_handle is not None:
+            # a higher priority waiter may now be at the head of the queue
+            self.dispatch_handle.cancel()
+        self._dispatch()
+
+        await future
@@ -0,0 +1,68 @@
+import hashlib
+import logging
+from collections import OrderedDict
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+
+class TokenCounter:
+    """
+    Counts and truncates prompt text in tokens of the generation model.
+
+    Uses the tiktoken encoding of `model_id` when tiktoken knows it (cl100k_base otherwise), and falls
+    back to ~4 characters per token when tiktoken is not installed or its encoding can not be loaded
+    (tiktoken downloads it on first use, which fails on hosts without network access). Counts are kept in an LRU keyed by
+    the text digest, so retrieved chunks are only tokenized the first time they are seen.
+    """
+
+    def __init__(self, model_id: str = None, max_cache_entries: int = 50000):
+        self.max_cache_entries = max_cache_entries
+        self.token_counts = OrderedDict()
+
+        self.logger = logging.getLogger("uvicorn.error")
+
+        self.encoding = None
+        if tiktoken is not None:
+            try:
+                try:
+                    self.encoding = tiktoken.encoding_for_model(model_id)
+                except (KeyError, TypeError):
+                    self.encoding = tiktoken.get_encoding("cl100k_base")
+            except Exception as e:
+                self.logger.warning(f"Can not load the tiktoken encoding, counting ~4 characters per token: {e}")
+                self.encoding = None
+
+    def _count(self, text: str):
+        if self.encoding is not None:
+            return len(self.encoding.encode(text, disallowed_special=()))
+        return len(text) // 4 + 1
+
+    def count(self, text: str):
+        if not text:
+            return 0
+
+        key = hashlib.sha1(text.encode("utf-8")).digest()
+        tokens_count = self.token_counts.get(key)
+        if tokens_count is not None:
+            self.token_counts.move_to_end(key)
+            return tokens_count
+
+        tokens_count = self._count(text)
+        self.token_counts[key] = tokens_count
+        if len(self.token_counts) > self.max_cache_entries:
+            self.token_counts.popitem(last=False)
+
+        return tokens_count
+
+    def truncate(self, text: str, max_tokens: int):
+        if max_tokens <= 0:
+            return ""
+
+        if self.encoding is not None:
+            tokens = self.encoding.encode(text, disallowed_special=())
+            return self.encoding.decode(tokens[:max_tokens]) if len(tokens) > max_tokens else text
+
+        return text[:max_tokens * 4]
@@ -1,9 +1,10 @@
 import logging
 
 import cohere
+from cohere.errors import TooManyRequestsError
 from typing import List, Union
-from ..LLMEnums import CoHereEnums, DocumentTypeEnum
-from ..LLMInterface import LLMInterface
+from ..LLMEnums import CoHereEnums, DocumentTypeEnum, LLMRequestPriorityEnum
+from ..LLMInterface import LLMInterface, LLMRateLimitError
 
 
 class CoHereProvider(LLMInterface):
@@ -12,7 +13,8 @@ class CoHereProvider(LLMInterface):
                  generation_api_key: str = None, generation_api_url: str = None,
                  default_input_max_tokens: int = 1000,
                  default_generation_max_output_tokens: int = 1000,
-                 default_generation_temperature: float = 0.1):
+                 default_generation_temperature: float = 0.1,
+                 http_client=None, rate_limiter=None):
 
         self.embedding_api_key = embedding_api_key
         self.embedding_api_url = embedding_api_url
@@ -23,15 +25,24 @@ class CoHereProvider(LLMInterface):
         self.default_generation_max_output_tokens = default_generation_max_output_tokens
         self.default_generation_temperature = default_generation_temperature
 
+        self.rate_limiter = rate_limiter
+
         self.generation_model_id = None
         self.embedding_model_id = None
         self.embedding_size = None
 
+        # per-request limits of the embed endpoint (texts are truncated by process_text)
+        self.max_embedding_batch_size = 96
+        self.max_embedding_batch_tokens = None
+
+        self.embedding_client = None
+        self.generation_client = None
+
         if embedding_api_key:
-            self.embedding_client = cohere.Client(api_key=self.embedding_api_key)
+            self.embedding_client = cohere.AsyncClient(api_key=self.embedding_api_key, httpx_client=http_client)
 
         if generation_api_key:
-            self.generation_client = cohere.Client(api_key=self.generation_api_key)
+            self.generation_client = cohere.AsyncClient(api_key=self.generation_api_key, httpx_client=http_client)
 
         self.enums = CoHereEnums
 
@@ -44,11 +55,20 @@ class CoHereProvider(LLMInterface):
         self.embedding_model_id = model_id
         self.embedding_size = embedding_size
 
+    async def wait_for_rate_limit(self, texts: List[str], priority: int, output_tokens: int = 0):
+        if self.rate_limiter is None:
+            return
+
+        await self.rate_limiter.acquire(
+            tokens=self.rate_limiter.estimate_tokens(texts) + (output_tokens or 0),
+            priority=priority
+        )
+
     def process_text(self, text: str):
         return text[:self.default_input_max_tokens].strip()
 
-    def generate_text(self, prompt: str, chat_history: list = [],
-                      max_output_tokens: int = None, temperature: float = None):
+    async def generate_text(self, prompt: str, chat_history: list = [],
+                            max_output_tokens: int = None, temperature: float = None):
         if not self.generation_client:
             self.logger.error("CoHere Generation client is not initialized")
             return None
@@ -60,7 +80,11 @@ class CoHereProvider(LLMInterface):
         max_output_tokens = max_output_tokens if max_output_tokens is not None else self.default_generation_max_output_tokens
         temperature = temperature if temperature is not None else self.default_generation_temperature
 
-        response = self.generation_client.chat(
+        await self.wait_for_rate_limit(texts=[prompt] + [m["text"] for m in chat_history],
+                                       output_tokens=max_output_tokens,
+                                       priority=LLMRequestPriorityEnum.INTERACTIVE.value)
+
+        response = await self.generation_client.chat(
             model=self.generation_model_id,
             chat_history=chat_history,
             message=self.process_text(prompt),
@@ -74,7 +98,34 @@ class CoHereProvider(LLMInterface):
 
         return response.text
 
-    def embed_text(self, text: Union[str, List[str]], document_type: str = None):
+    async def generate_text_stream(self, prompt: str, chat_history: list = [],
+                                   max_output_tokens: int = None, temperature: float = None):
+        if not self.generation_client:
+            self.logger.error("CoHere Generation client is not initialized")
+            return
+
+        if not self.generation_model_id:
+            self.logger.error("Generation model for CoHere is not set")
+            return
+
+        max_output_tokens = max_output_tokens if max_output_tokens is not None else self.default_generation_max_output_tokens
+        temperature = temperature if temperature is not None else self.default_generation_temperature
+
+        await self.wait_for_rate_limit(texts=[prompt] + [m["text"] for m in chat_history],
+                                       output_tokens=max_output_tokens,
+                                       priority=LLMRequestPriorityEnum.INTERACTIVE.value)
+
+        async for event in self.generation_client.chat_stream(
+                model=self.generation_model_id,
+                chat_history=chat_history,
+                message=self.process_text(prompt),
+                max_tokens=max_output_tokens,
+                temperature=temperature
+        ):
+            if event.event_type == "text-generation" and event.text:
+                yield event.text
+
+    async def embed_text(self, text: Union[str, List[str]], document_type: str = None):
         if not self.embedding_client:
             self.logger.error("CoHere Embedding client is not initialized")
             return None
@@ -86,16 +137,25 @@ class CoHereProvider(LLMInterface):
             self.logger.error("Embedding model for CoHere is not set")
             return None
 
-        input_type = CoHereEnums.DOCUMENT
-        if document_type == DocumentTypeEnum.QUERY:
-            input_type = CoHereEnums.QUERY
-
-        response = self.embedding_client.embed(
-            model=self.embedding_model_id,
-            texts=[self.process_text(t) for t in text],
-            input_type=input_type,
-            embedding_types=['float']
-        )
+        input_type = CoHereEnums.DOCUMENT.value
+        priority = LLMRequestPriorityEnum.BULK.value
+        if document_type == DocumentTypeEnum.QUERY.value:
+            input_type = CoHereEnums.QUERY.value
+            priority = LLMRequestPriorityEnum.INTERACTIVE.value
+
+        await self.wait_for_rate_limit(texts=text, priority=priority)
+
+        try:
+            response = await self.embedding_client.embed(
+                model=self.embedding_model_id,
+                texts=[self.process_text(t) for t in text],
+                input_type=input_type,
+                embedding_types=['float'],
+                # EmbeddingBatcher retries rate limits with backoff and retry-after; SDK retries would multiply them
+                request_options={"max_retries": 0}
+            )
+        except TooManyRequestsError as e:
+            raise LLMRateLimitError(str(e))
 
         if not response or not response.embeddings or not response.embeddings.float:
             self.logger.error("Error while embedding text with CoHere")
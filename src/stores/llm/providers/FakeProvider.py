@@ -0,0 +1,113 @@
+import asyncio
+import hashlib
+import logging
+import random
+from typing import List, Union
+
+import numpy as np
+
+from ..LLMEnums import OpenAIEnums
+from ..LLMInterface import LLMInterface, LLMRateLimitError
+
+
+class FakeProvider(LLMInterface):
+    """
+    Offline provider for benchmarks and load tests.
+
+    Embeddings are unit vectors of `embedding_size` seeded by sha256 of the text, so the same text
+    always gets the same vector in every process. Generations are canned text built from the prompt.
+    Every call waits `latency_ms` +/- `jitter_ms`, and fails with probability `error_rate`
+    (a rate-limit error for embeddings, None for generations).
+    """
+
+    def __init__(self, latency_ms: int = 0, jitter_ms: int = 0, error_rate: float = 0.0,
+                 default_input_max_tokens: int = 1000,
+                 default_generation_max_output_tokens: int = 1000,
+                 default_generation_temperature: float = 0.1):
+
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+
+        self.default_input_max_tokens = default_input_max_tokens
+        self.default_generation_max_output_tokens = default_generation_max_output_tokens
+        self.default_generation_temperature = default_generation_temperature
+
+        self.generation_model_id = None
+        self.embedding_model_id = None
+        self.embedding_size = None
+
+        self.max_embedding_batch_size = 2048
+        self.max_embedding_batch_tokens = None
+
+        self.enums = OpenAIEnums
+
+        self.logger = logging.getLogger(__name__)
+
+    def set_generation_model(self, model_id: str):
+        self.generation_model_id = model_id
+
+    def set_embedding_model(self, model_id: str, embedding_size: int):
+        self.embedding_model_id = model_id
+        self.embedding_size = embedding_size
+
+    def process_text(self, text: str):
+        return text[:self.default_input_max_tokens].strip()
+
+    async def simulate_call(self):
+        delay_ms = self.latency_ms + random.uniform(-self.jitter_ms, self.jitter_ms)
+        if delay_ms > 0:
+            await asyncio.sleep(delay_ms / 1000)
+
+        return random.random() >= self.error_rate
+
+    def construct_answer(self, prompt: str, max_output_tokens: int = None):
+        max_output_tokens = max_output_tokens if max_output_tokens is not None else self.default_generation_max_output_tokens
+        prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:12]
+        words = f"Fake answer {prompt_hash} based on {len(prompt)} prompt characters.".split()
+        return " ".join(words[:max_output_tokens])
+
+    async def generate_text(self, prompt: str, chat_history: list = [],
+                            max_output_tokens: int = None, temperature: float = None):
+        chat_history.append(self.construct_prompt(prompt, OpenAIEnums.USER.value))
+
+        if not await self.simulate_call():
+            self.logger.error("Injected error while generating text with the fake provider")
+            return None
+
+        return self.construct_answer(prompt=prompt, max_output_tokens=max_output_tokens)
+
+    async def generate_text_stream(self, prompt: str, chat_history: list = [],
+                                   max_output_tokens: int = None, temperature: float = None):
+        chat_history.append(self.construct_prompt(prompt, OpenAIEnums.USER.value))
+
+        if not await self.simulate_call():
+            self.logger.error("Injected error while generating text with the fake provider")
+            return
+
+        for i, word in enumerate(self.construct_answer(prompt=prompt, max_output_tokens=max_output_tokens).split()):
+            yield word if i == 0 else f" {word}"
+
+    def embed_single_text(self, text: str):
+        seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+        vector = np.random.default_rng(seed).standard_normal(self.embedding_size)
+        return (vector / np.linalg.norm(vector)).tolist()
+
+    async def embed_text(self, text: Union[str, List[str]], document_type: str = None):
+        if not self.embedding_size:
+            self.logger.error("Embedding size for the fake provider is not set")
+            return None
+
+        if isinstance(text, str):
+            text = [text]
+
+        if not await self.simulate_call():
+            raise LLMRateLimitError("Injected rate limit from the fake provider")
+
+        return [self.embed_single_text(self.process_text(t)) for t in text]
+
+    def construct_prompt(self, prompt: str, role: str):
+        return {
+            "role": role,
+            "content": prompt
+        }
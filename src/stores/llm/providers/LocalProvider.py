@@ -0,0 +1,151 @@
+import asyncio
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Union
+
+import numpy as np
+
+from ..LLMEnums import OpenAIEnums
+from ..LLMInterface import LLMInterface
+
+
+class LocalProvider(LLMInterface):
+    """
+    Embedding-only provider running a sentence-embedding ONNX model on CPU.
+
+    The model is read from `{model_path}/{model_id}/model.onnx` with its `tokenizer.json`, so it works
+    without network access. Inputs are embedded in batches of `batch_size` on a dedicated thread pool
+    (ONNX Runtime releases the GIL), mean-pooled over the attention mask and L2-normalised.
+    """
+
+    def __init__(self, model_path: str = None, max_length: int = 256, batch_size: int = 32,
+                 num_threads: int = 4, max_workers: int = 2,
+                 default_input_max_tokens: int = 1000):
+
+        self.model_path = model_path
+        self.max_length = max_length
+        self.batch_size = batch_size
+        self.num_threads = num_threads
+
+        self.default_input_max_tokens = default_input_max_tokens
+
+        self.generation_model_id = None
+        self.embedding_model_id = None
+        self.embedding_size = None
+
+        # batching is done here, per inference run
+        self.max_embedding_batch_size = None
+        self.max_embedding_batch_tokens = None
+
+        self.session = None
+        self.tokenizer = None
+        self.input_names = []
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="local-embedding")
+
+        self.enums = OpenAIEnums
+
+        self.logger = logging.getLogger(__name__)
+
+    def set_generation_model(self, model_id: str):
+        self.generation_model_id = model_id
+
+    def set_embedding_model(self, model_id: str, embedding_size: int):
+        self.embedding_model_id = model_id
+        self.embedding_size = embedding_size
+        self.load_model()
+
+    def load_model(self):
+        model_dir = os.path.join(self.model_path or "", self.embedding_model_id or "")
+        model_file = os.path.join(model_dir, "model.onnx")
+        tokenizer_file = os.path.join(model_dir, "tokenizer.json")
+
+        if not os.path.isfile(model_file) or not os.path.isfile(tokenizer_file):
+            self.logger.error(f"Local embedding model not found in: {model_dir}")
+            return False
+
+        try:
+            import onnxruntime as ort
+            from tokenizers import Tokenizer
+        except ImportError as e:
+            self.logger.error(f"Local embedding provider requires onnxruntime and tokenizers: {e}")
+            return False
+
+        session_options = ort.SessionOptions()
+        session_options.intra_op_num_threads = self.num_threads
+
+        self.session = ort.InferenceSession(model_file, sess_options=session_options,
+                                            providers=["CPUExecutionProvider"])
+        self.input_names = [i.name for i in self.session.get_inputs()]
+
+        self.tokenizer = Tokenizer.from_file(tokenizer_file)
+        self.tokenizer.enable_truncation(max_length=self.max_length)
+        self.tokenizer.enable_padding()
+
+        return True
+
+    def process_text(self, text: str):
+        return text[:self.default_input_max_tokens].strip()
+
+    async def generate_text(self, prompt: str, chat_history: list = [],
+                            max_output_tokens: int = None, temperature: float = None):
+        self.logger.error("Local provider does not support text generation")
+        return None
+
+    async def generate_text_stream(self, prompt: str, chat_history: list = [],
+                                   max_output_tokens: int = None, temperature: float = None):
+        self.logger.error("Local provider does not support text generation")
+        return
+        yield
+
+    def _embed_batch(self, texts: List[str]):
+        encodings = self.tokenizer.encode_batch(texts)
+
+        input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+        attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+
+        inputs = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self.input_names:
+            inputs["token_type_ids"] = np.array([e.type_ids for e in encodings], dtype=np.int64)
+
+        outputs = self.session.run(None, {k: v for k, v in inputs.items() if k in self.input_names})[0]
+
+        # token embeddings (batch, tokens, dim) are mean-pooled; already pooled outputs are used as-is
+        if outputs.ndim == 3:
+            mask = attention_mask[..., None].astype(outputs.dtype)
+            outputs = (outputs * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+
+        norms = np.linalg.norm(outputs, axis=1, keepdims=True)
+        outputs = outputs / np.clip(norms, 1e-12, None)
+
+        return outputs.tolist()
+
+    async def embed_text(self, text: Union[str, List[str]], document_type: str = None):
+        if self.session is None or self.tokenizer is None:
+            self.logger.error("Local embedding model is not loaded")
+            return None
+
+        if isinstance(text, str):
+            text = [text]
+
+        texts = [self.process_text(t) for t in text]
+        if not texts:
+            return None
+
+        loop = asyncio.get_running_loop()
+        try:
+            batches = await asyncio.gather(*[
+                loop.run_in_executor(self.executor, self._embed_batch, texts[i:i + self.batch_size])
+                for i in range(0, len(texts), self.batch_size)
+            ])
+        except Exception as e:
+            self.logger.error(f"Error while embedding text with the local model: {e}")
+            return None
+
+        return [vector for batch in batches for vector in batch]
+
+    def construct_prompt(self, prompt: str, role: str):
+        return {
+            "role": role,
+            "content": prompt
+        }
@@ -1,9 +1,9 @@
 import logging
 
-from openai import OpenAI
+from openai import AsyncOpenAI, RateLimitError
 from typing import List,Union
-from ..LLMEnums import OpenAIEnums
-from ..LLMInterface import LLMInterface
+from ..LLMEnums import OpenAIEnums, DocumentTypeEnum, LLMRequestPriorityEnum
+from ..LLMInterface import LLMInterface, LLMRateLimitError
 
 
 class OpenAIProvider(LLMInterface):
@@ -12,7 +12,8 @@ class OpenAIProvider(LLMInterface):
                  generation_api_key: str = None, generation_api_url: str = None,
                  default_input_max_tokens: int = 1000,
                  default_generation_max_output_tokens: int = 1000,
-                 default_generation_temperature: float = 0.1):
+                 default_generation_temperature: float = 0.1,
+                 http_client=None, rate_limiter=None):
 
         self.embedding_api_key = embedding_api_key
         self.embedding_api_url = embedding_api_url
@@ -23,21 +24,34 @@ class OpenAIProvider(LLMInterface):
         self.default_generation_max_output_tokens = default_generation_max_output_tokens
         self.default_generation_temperature = default_generation_temperature
 
+        self.rate_limiter = rate_limiter
+
         self.generation_model_id = None
         self.embedding_model_id = None
         self.embedding_size = None
 
+        # per-request limits of the embeddings endpoint
+        self.max_embedding_batch_size = 2048
+        self.max_embedding_batch_tokens = 300000
+
+        self.embedding_client = None
+        self.generation_client = None
+
         if embedding_api_key:
-            self.embedding_client = OpenAI(
+            # EmbeddingBatcher retries rate limits with backoff and retry-after; SDK retries would multiply them
+            self.embedding_client = AsyncOpenAI(
                 api_key=self.embedding_api_key,
-                base_url=self.embedding_api_url if self.embedding_api_url and len(self.embedding_api_url) > 0 else None
+                base_url=self.embedding_api_url if self.embedding_api_url and len(self.embedding_api_url) > 0 else None,
+                http_client=http_client,
+                max_retries=0
             )
 
         if generation_api_key:
-            self.generation_client = OpenAI(
+            self.generation_client = AsyncOpenAI(
                 api_key=self.generation_api_key,
                 base_url=self.generation_api_url if self.generation_api_url and len(
-                    self.generation_api_url) > 0 else None
+                    self.generation_api_url) > 0 else None,
+                http_client=http_client
             )
 
         self.enums = OpenAIEnums
@@ -51,11 +65,20 @@ class OpenAIProvider(LLMInterface):
         self.embedding_model_id = model_id
         self.embedding_size = embedding_size
 
+    async def wait_for_rate_limit(self, texts: List[str], priority: int, output_tokens: int = 0):
+        if self.rate_limiter is None:
+            return
+
+        await self.rate_limiter.acquire(
+            tokens=self.rate_limiter.estimate_tokens(texts) + (output_tokens or 0),
+            priority=priority
+        )
+
     def process_text(self, text: str):
         return text[:self.default_input_max_tokens].strip()
 
-    def generate_text(self, prompt: str, chat_history: list = [],
-                      max_output_tokens: int = None, temperature: float = None):
+    async def generate_text(self, prompt: str, chat_history: list = [],
+                            max_output_tokens: int = None, temperature: float = None):
         if not self.generation_client:
             self.logger.error("OpenAI Generation client is not initialized")
             return None
@@ -69,7 +92,10 @@ class OpenAIProvider(LLMInterface):
 
         chat_history.append(self.construct_prompt(prompt, OpenAIEnums.USER.value))
 
-        response = self.generation_client.chat.completions.create(
+        await self.wait_for_rate_limit(texts=[m["content"] for m in chat_history], output_tokens=max_output_tokens,
+                                       priority=LLMRequestPriorityEnum.INTERACTIVE.value)
+
+        response = await self.generation_client.chat.completions.create(
             model=self.generation_model_id,
             messages=chat_history,
             max_tokens=max_output_tokens,
@@ -82,7 +108,40 @@ class OpenAIProvider(LLMInterface):
 
         return response.choices[0].message.content
 
-    def embed_text(self, text: Union[str,List[str]], document_type: str = None):
+    async def generate_text_stream(self, prompt: str, chat_history: list = [],
+                                   max_output_tokens: int = None, temperature: float = None):
+        if not self.generation_client:
+            self.logger.error("OpenAI Generation client is not initialized")
+            return
+
+        if not self.generation_model_id:
+            self.logger.error("Generation model for OpenAI is not set")
+            return
+
+        max_output_tokens = max_output_tokens if max_output_tokens is not None else self.default_generation_max_output_tokens
+        temperature = temperature if temperature is not None else self.default_generation_temperature
+
+        chat_history.append(self.construct_prompt(prompt, OpenAIEnums.USER.value))
+
+        await self.wait_for_rate_limit(texts=[m["content"] for m in chat_history], output_tokens=max_output_tokens,
+                                       priority=LLMRequestPriorityEnum.INTERACTIVE.value)
+
+        stream = await self.generation_client.chat.completions.create(
+            model=self.generation_model_id,
+            messages=chat_history,
+            max_tokens=max_output_tokens,
+            temperature=temperature,
+            stream=True
+        )
+
+        async for chunk in stream:
+            if not chunk.choices or not chunk.choices[0].delta:
+                continue
+
+            if chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+    async def embed_text(self, text: Union[str,List[str]], document_type: str = None):
         if not self.embedding_client:
             self.logger.error("OpenAI Embedding client is not initialized")
             return None
@@ -105,11 +164,19 @@ class OpenAIProvider(LLMInterface):
         except Exception:
             pass
 
+        priority = LLMRequestPriorityEnum.BULK.value
+        if document_type == DocumentTypeEnum.QUERY.value:
+            priority = LLMRequestPriorityEnum.INTERACTIVE.value
+        await self.wait_for_rate_limit(texts=text, priority=priority)
+
         try:
-            response = self.embedding_client.embeddings.create(
+            response = await self.embedding_client.embeddings.create(
                 model=self.embedding_model_id,
                 input=text
             )
+        except RateLimitError as e:
+            retry_after = e.response.headers.get("retry-after") if e.response is not None else None
+            raise LLMRateLimitError(str(e), retry_after=float(retry_after) if retry_after else None)
         except Exception as e:
             self.logger.error(f"OpenAI embeddings.create failed: {e}")
             return None
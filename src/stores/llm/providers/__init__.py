@@ -1,2 +1,4 @@
 from .CoHereProvider import CoHereProvider
+from .FakeProvider import FakeProvider
+from .LocalProvider import LocalProvider
 from .OpenAIProvider import OpenAIProvider
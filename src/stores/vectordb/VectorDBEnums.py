@@ -28,6 +28,31 @@ class PgVectorDistanceMethodEnums(Enum):
     DOT = "vector_l2_ops"
 
 
+class PgVectorDistanceOperatorEnums(Enum):
+    COSINE = "<=>"
+    L2 = "<->"
+    INNER_PRODUCT = "<#>"
+    HAMMING = "<~>"
+
+
+class PgVectorSearchParamEnums(Enum):
+    HNSW_EF_SEARCH = "hnsw.ef_search"
+    IVFFLAT_PROBES = "ivfflat.probes"
+
+
 class PgVectorIndexTypeEnums(Enum):
     HNSW = "hnsw"
-    IVFFLAT = "ivfflat"
\ No newline at end of file
+    IVFFLAT = "ivfflat"
+
+
+class VectorQuantizationEnums(Enum):
+    NONE = "none"
+    HALF = "half"
+    SCALAR = "scalar"
+    BINARY = "binary"
+
+
+class PgVectorColumnTypeEnums(Enum):
+    VECTOR = "vector"
+    HALFVEC = "halfvec"
+    BIT = "bit"
@@ -48,5 +48,23 @@ class VectorDBInterface(ABC):
         pass
 
     @abstractmethod
-    def search_by_vector(self, collection_name: str, vector: list, limit: int) -> List[RetrievedDocument]:
+    def start_bulk_load(self, collection_name: str, drop_index: bool = False):
+        pass
+
+    @abstractmethod
+    def finish_bulk_load(self, collection_name: str):
+        pass
+
+    @abstractmethod
+    def reset_vector_index(self, collection_name: str, index_type: str = None) -> bool:
+        pass
+
+    @abstractmethod
+    def delete_by_record_ids(self, collection_name: str, record_ids: list):
+        pass
+
+    @abstractmethod
+    def search_by_vector(self, collection_name: str, vector: list, limit: int,
+                         exact: bool = False, ef_search: int = None,
+                         probes: int = None) -> List[RetrievedDocument]:
         pass
@@ -5,10 +5,11 @@ from sqlalchemy.orm import sessionmaker
 
 
 class VectorDBProviderFactory:
-    def __init__(self, config, db_client: sessionmaker = None):
+    def __init__(self, config, db_client: sessionmaker = None, db_engine=None):
         self.config = config
         self.base_controller = BaseController()
         self.db_client = db_client
+        self.db_engine = db_engine
 
     def create(self, provider: str):
         if provider == VectorDBEnums.QDRANT.value:
@@ -19,14 +20,22 @@ class VectorDBProviderFactory:
                 distance_method=self.config.VECTOR_DB_DISTANCE_METHOD,
                 default_vector_size=self.config.EMBEDDING_MODEL_SIZE,
                 index_threshold=self.config.VECTOR_DB_PGVEC_INDEX_THRESHOLD,
+                quantization=self.config.VECTOR_DB_QUANTIZATION,
+                rescore_factor=self.config.VECTOR_DB_QUANTIZATION_RESCORE_FACTOR,
             )
 
         if provider == VectorDBEnums.PGVECTOR.value:
             return PGVectorProvider(
                 db_client=self.db_client,
+                db_engine=self.db_engine,
                 distance_method=self.config.VECTOR_DB_DISTANCE_METHOD,
                 default_vector_size=self.config.EMBEDDING_MODEL_SIZE,
                 index_threshold=self.config.VECTOR_DB_PGVEC_INDEX_THRESHOLD,
+                quantization=self.config.VECTOR_DB_QUANTIZATION,
+                rescore_factor=self.config.VECTOR_DB_QUANTIZATION_RESCORE_FACTOR,
+                index_type=self.config.VECTOR_DB_PGVEC_INDEX_TYPE,
+                maintenance_work_mem=self.config.VECTOR_DB_PGVEC_MAINTENANCE_WORK_MEM,
+                metadata_cache_ttl=self.config.VECTOR_DB_PGVEC_METADATA_CACHE_TTL_SECONDS,
             )
 
         return None
@@ -1,22 +1,37 @@
 from ..VectorDBInterface import VectorDBInterface
 from ..VectorDBEnums import (DistanceMethodEnums, PgVectorTableSchemeEnums,
-                             PgVectorDistanceMethodEnums, PgVectorIndexTypeEnums)
+                             PgVectorDistanceMethodEnums, PgVectorIndexTypeEnums,
+                             VectorQuantizationEnums, PgVectorColumnTypeEnums,
+                             PgVectorDistanceOperatorEnums, PgVectorSearchParamEnums)
 import logging
 from typing import List
+from collections import Counter
 from models.db_schemes import RetrievedDocument
+from sqlalchemy import event
+from sqlalchemy.exc import ProgrammingError
 from sqlalchemy.sql import text as sql_text
+from pgvector.asyncpg import register_vector
+import numpy as np
 import json
+import math
+import time
 
 
 class PGVectorProvider(VectorDBInterface):
 
-    def __init__(self, db_client, default_vector_size: int = 786,
-                 distance_method: str = None, index_threshold: int = 100):
+    def __init__(self, db_client, db_engine=None, default_vector_size: int = 786,
+                 distance_method: str = None, index_threshold: int = 100,
+                 quantization: str = None, rescore_factor: int = 4,
+                 index_type: str = None, maintenance_work_mem: str = "512MB",
+                 metadata_cache_ttl: int = 60):
 
         self.db_client = db_client
+        self.db_engine = db_engine
         self.default_vector_size = default_vector_size
 
         self.index_threshold = index_threshold
+        self.index_type = index_type or PgVectorIndexTypeEnums.HNSW.value
+        self.maintenance_work_mem = maintenance_work_mem
 
         if distance_method == DistanceMethodEnums.COSINE.value:
             distance_method = PgVectorDistanceMethodEnums.COSINE.value
@@ -26,9 +41,52 @@ class PGVectorProvider(VectorDBInterface):
         self.pgvector_table_prefix = PgVectorTableSchemeEnums._PREFIX.value
         self.distance_method = distance_method
 
+        # half/scalar store halfvec columns (pgvector has no int8 type); binary keeps full vectors for the
+        # rerank and indexes their binary_quantize() expression, fetching `rescore_factor` x limit candidates
+        self.quantization = quantization or VectorQuantizationEnums.NONE.value
+        self.rescore_factor = rescore_factor
+
+        self.column_type = PgVectorColumnTypeEnums.VECTOR.value
+        self.index_ops = self.distance_method
+        if self.quantization in (VectorQuantizationEnums.HALF.value, VectorQuantizationEnums.SCALAR.value):
+            self.column_type = PgVectorColumnTypeEnums.HALFVEC.value
+            self.index_ops = self.distance_method.replace(PgVectorColumnTypeEnums.VECTOR.value,
+                                                          PgVectorColumnTypeEnums.HALFVEC.value, 1)
+        elif self.quantization == VectorQuantizationEnums.BINARY.value:
+            self.index_ops = "bit_hamming_ops"
+
+        # KNN queries must ORDER BY the raw operator of the index ops class, or the index is not used
+        self.distance_operator = PgVectorDistanceOperatorEnums.COSINE.value
+        if self.distance_method.endswith("_l2_ops"):
+            self.distance_operator = PgVectorDistanceOperatorEnums.L2.value
+        elif self.distance_method.endswith("_ip_ops"):
+            self.distance_operator = PgVectorDistanceOperatorEnums.INNER_PRODUCT.value
+
+        # collection/index name -> monotonic time it was last seen to exist. Only existence is cached, for
+        # `metadata_cache_ttl` seconds, so a drop by another worker is picked up within the TTL (or on the
+        # first failing query); creations are always checked against the catalog
+        self.metadata_cache_ttl = metadata_cache_ttl
+        self.known_collections = {}
+        self.known_indexes = {}
+
+        # running loads per collection between start_bulk_load/finish_bulk_load; their index is built
+        # once the last one finishes
+        self.bulk_loading_collections = Counter()
+
         self.logger = logging.getLogger("uvicorn")
         self.default_index_name = lambda collection_name: f"{collection_name}_vector_idx"
 
+    def query_vector_sql(self):
+        # CAST() rather than '::', which clashes with the :vector bind parameter
+        return f'CAST(:vector AS {self.column_type}({self.default_vector_size}))'
+
+    def binary_vector_sql(self, vector_sql: str):
+        return f'CAST(binary_quantize({vector_sql}) AS {PgVectorColumnTypeEnums.BIT.value}({self.default_vector_size}))'
+
+    def index_expression_sql(self):
+        if self.quantization == VectorQuantizationEnums.BINARY.value:
+            return f'({self.binary_vector_sql(PgVectorTableSchemeEnums.VECTOR.value)})'
+        return PgVectorTableSchemeEnums.VECTOR.value
 
     async def connect(self):
         async with self.db_client() as session:
@@ -48,13 +106,53 @@ class PGVectorProvider(VectorDBInterface):
                 self.logger.warning(f"Vector extension setup: {str(e)}")
                 await session.rollback()
 
+        # the codec needs the vector types, so it is registered once the extension exists; pooled
+        # connections opened before that are dropped so every connection sends vectors in binary
+        if self.db_engine is not None and not event.contains(self.db_engine.sync_engine, "connect",
+                                                              self.register_vector_codec):
+            event.listen(self.db_engine.sync_engine, "connect", self.register_vector_codec)
+            await self.db_engine.dispose()
+
+    @staticmethod
+    def register_vector_codec(dbapi_connection, connection_record):
+        dbapi_connection.run_async(register_vector)
+
+    @staticmethod
+    def to_db_vector(vector: list):
+        # encoded by the pgvector binary codec, no text formatting/parsing on either side
+        return np.asarray(vector, dtype=np.float32)
+
 
     async def disconnect(self):
-        pass
+        if self.db_engine is not None and event.contains(self.db_engine.sync_engine, "connect",
+                                                          self.register_vector_codec):
+            event.remove(self.db_engine.sync_engine, "connect", self.register_vector_codec)
+
+        self.known_collections.clear()
+        self.known_indexes.clear()
+
+
+    def is_known(self, known_names: dict, name: str) -> bool:
+        seen_at = known_names.get(name)
+        if seen_at is None:
+            return False
+
+        if time.monotonic() - seen_at >= self.metadata_cache_ttl:
+            del known_names[name]
+            return False
+
+        return True
+
+    def forget_collection(self, collection_name: str):
+        self.known_collections.pop(collection_name, None)
+        self.known_indexes.pop(self.default_index_name(collection_name), None)
 
 
     async def is_collection_existed(self, collection_name: str) -> bool:
 
+        if self.is_known(self.known_collections, collection_name):
+            return True
+
         record = None
         async with self.db_client() as session:
             async with session.begin():
@@ -62,7 +160,10 @@ class PGVectorProvider(VectorDBInterface):
                 results = await session.execute(list_tbl, {"collection_name": collection_name})
                 record = results.scalar_one_or_none()
 
-        return record
+        if record:
+            self.known_collections[collection_name] = time.monotonic()
+
+        return bool(record)
 
 
     async def list_all_collections(self) -> List:
@@ -94,6 +195,13 @@ class PGVectorProvider(VectorDBInterface):
                 if not table_data:
                     return None
 
+                storage_sql = sql_text(
+                    'SELECT pg_table_size(CAST(:collection_name AS regclass)) as table_size, '
+                    'pg_indexes_size(CAST(:collection_name AS regclass)) as indexes_size, '
+                    'pg_total_relation_size(CAST(:collection_name AS regclass)) as total_size'
+                )
+                storage = (await session.execute(storage_sql, {"collection_name": collection_name})).fetchone()
+
                 return {
                     "table_info": {
                         "schemaname": table_data[0],
@@ -103,6 +211,13 @@ class PGVectorProvider(VectorDBInterface):
                         "hasindexes": table_data[4],
                     },
                     "record_count": record_count.scalar_one(),
+                    "storage": {
+                        "quantization": self.quantization,
+                        "column_type": self.column_type,
+                        "table_size_bytes": storage.table_size,
+                        "indexes_size_bytes": storage.indexes_size,
+                        "total_size_bytes": storage.total_size,
+                    },
                 }
 
 
@@ -115,6 +230,8 @@ class PGVectorProvider(VectorDBInterface):
                 await session.execute(delete_sql)
                 await session.commit()
 
+        self.forget_collection(collection_name)
+
         return True
 
 
@@ -125,16 +242,20 @@ class PGVectorProvider(VectorDBInterface):
         if do_reset:
             _ = await self.delete_collection(collection_name=collection_name)
 
+        # always ask the catalog: another worker may have dropped a collection this worker has cached
+        self.forget_collection(collection_name)
+
         is_collection_existed = await self.is_collection_existed(collection_name=collection_name)
         if not is_collection_existed:
             self.logger.info(f"Creating collection: {collection_name}")
             async with self.db_client() as session:
                 async with session.begin():
+                    # IF NOT EXISTS: another worker may create it between the check and here
                     create_sql = sql_text(
-                        f'CREATE TABLE {collection_name} ('
+                        f'CREATE TABLE IF NOT EXISTS {collection_name} ('
                         f'{PgVectorTableSchemeEnums.ID.value} bigserial PRIMARY KEY,'
                         f'{PgVectorTableSchemeEnums.TEXT.value} text, '
-                        f'{PgVectorTableSchemeEnums.VECTOR.value} vector({embedding_size}), '
+                        f'{PgVectorTableSchemeEnums.VECTOR.value} {self.column_type}({embedding_size}), '
                         f'{PgVectorTableSchemeEnums.METADATA.value} jsonb DEFAULT \'{{}}\', '
                         f'{PgVectorTableSchemeEnums.CHUNK_ID.value} integer, '
                         f'FOREIGN KEY ({PgVectorTableSchemeEnums.CHUNK_ID.value}) REFERENCES chunks(chunk_id)'
@@ -143,6 +264,8 @@ class PGVectorProvider(VectorDBInterface):
                     await session.execute(create_sql)
                     await session.commit()
 
+            self.known_collections[collection_name] = time.monotonic()
+
             return True
 
         return False
@@ -150,58 +273,155 @@ class PGVectorProvider(VectorDBInterface):
 
     async def is_index_existed(self, collection_name: str) -> bool:
         index_name = self.default_index_name(collection_name)
+        if self.is_known(self.known_indexes, index_name):
+            return True
+
         async with self.db_client() as session:
             async with session.begin():
-                check_sql = sql_text(f""" 
-                                    SELECT 1 
-                                    FROM pg_indexes 
-                                    WHERE tablename = :collection_name
-                                    AND indexname = :index_name
+                # an interrupted CONCURRENTLY build leaves an invalid index, which does not count
+                check_sql = sql_text("""
+                                    SELECT 1
+                                    FROM pg_index
+                                    JOIN pg_class index_class ON index_class.oid = pg_index.indexrelid
+                                    JOIN pg_class table_class ON table_class.oid = pg_index.indrelid
+                                    WHERE table_class.relname = :collection_name
+                                    AND index_class.relname = :index_name
+                                    AND pg_index.indisvalid
                                     """)
                 results = await session.execute(check_sql,
                                                 {"index_name": index_name, "collection_name": collection_name})
+                is_index_existed = bool(results.scalar_one_or_none())
+
+        if is_index_existed:
+            self.known_indexes[index_name] = time.monotonic()
 
-                return bool(results.scalar_one_or_none())
+        return is_index_existed
 
 
-    async def create_vector_index(self, collection_name: str,
-                                  index_type: str = PgVectorIndexTypeEnums.HNSW.value):
-        is_index_existed = await self.is_index_existed(collection_name=collection_name)
-        if is_index_existed:
-            return False
+    def get_index_params(self, index_type: str, records_count: int) -> dict:
+        """Build parameters for the collection size, following pgvector's tuning guidance."""
+        if index_type == PgVectorIndexTypeEnums.IVFFLAT.value:
+            # rows / 1000 lists up to 1M rows, sqrt(rows) above
+            if records_count <= 1_000_000:
+                return {"lists": max(1, records_count // 1000)}
+            return {"lists": int(math.sqrt(records_count))}
 
+        # larger graphs need more links and a wider build candidate list to keep recall up
+        if records_count < 1_000_000:
+            return {"m": 16, "ef_construction": 64}
+        if records_count < 10_000_000:
+            return {"m": 24, "ef_construction": 128}
+        return {"m": 32, "ef_construction": 200}
+
+    async def get_records_estimate(self, collection_name: str) -> int:
         async with self.db_client() as session:
             async with session.begin():
-                count_sql = sql_text(f'SELECT COUNT(*) FROM {collection_name}')
-                result = await session.execute(count_sql)
-                records_count = result.scalar_one()
+                # planner estimate, exact right after the ANALYZE of finish_bulk_load; -1 if never analyzed
+                estimate_sql = sql_text('SELECT CAST(reltuples AS bigint) FROM pg_class '
+                                        'WHERE oid = CAST(:collection_name AS regclass)')
+                records_count = (await session.execute(estimate_sql,
+                                                       {"collection_name": collection_name})).scalar_one()
+                if records_count < 0:
+                    records_count = (await session.execute(
+                        sql_text(f'SELECT COUNT(*) FROM {collection_name}'))).scalar_one()
+
+        return records_count
+
+    async def build_vector_index(self, collection_name: str, index_name: str, index_type: str,
+                                 records_count: int) -> bool:
+        index_params = self.get_index_params(index_type=index_type, records_count=records_count)
+        with_sql = ", ".join(f"{param_name} = {int(param_value)}"
+                             for param_name, param_value in index_params.items())
+
+        self.logger.info(f"START: Creating {index_type} vector index {index_name} {index_params} "
+                         f"for collection: {collection_name}")
+
+        # CONCURRENTLY can not run inside a transaction block
+        async with self.db_engine.connect() as connection:
+            connection = await connection.execution_options(isolation_level="AUTOCOMMIT")
+            try:
+                # a failed concurrent build leaves an invalid index behind
+                await connection.execute(sql_text(f'DROP INDEX CONCURRENTLY IF EXISTS {index_name}'))
+                await connection.execute(sql_text("SELECT set_config('maintenance_work_mem', :value, false)"),
+                                         {"value": self.maintenance_work_mem})
+                await connection.execute(sql_text(
+                    f'CREATE INDEX CONCURRENTLY {index_name} ON {collection_name} '
+                    f'USING {index_type} ({self.index_expression_sql()} {self.index_ops}) '
+                    f'WITH ({with_sql})'
+                ))
+            except Exception as e:
+                self.logger.error(f"Error while creating vector index for collection {collection_name}: {e}")
+                await connection.execute(sql_text(f'DROP INDEX CONCURRENTLY IF EXISTS {index_name}'))
+                return False
+            finally:
+                await connection.execute(sql_text('RESET maintenance_work_mem'))
 
-                if records_count < self.index_threshold:
-                    return False
+        self.logger.info(f"END: Created vector index {index_name} for collection: {collection_name}")
 
-                self.logger.info(f"START: Creating vector index for collection: {collection_name}")
+        return True
 
-                index_name = self.default_index_name(collection_name)
-                create_idx_sql = sql_text(
-                    f'CREATE INDEX {index_name} ON {collection_name} '
-                    f'USING {index_type} ({PgVectorTableSchemeEnums.VECTOR.value} {self.distance_method})'
-                )
+    async def create_vector_index(self, collection_name: str, index_type: str = None):
+        """
+        Builds the vector index with CREATE INDEX CONCURRENTLY, so inserts and searches keep running
+        during the build. Called once after bulk loads and by `reset_vector_index`, never per insert.
+        """
+        index_type = index_type or self.index_type
+        if index_type not in [t.value for t in PgVectorIndexTypeEnums]:
+            self.logger.error(f"Unsupported vector index type: {index_type}")
+            return False
 
-                await session.execute(create_idx_sql)
+        is_index_existed = await self.is_index_existed(collection_name=collection_name)
+        if is_index_existed:
+            return False
 
-                self.logger.info(f"END: Created vector index for collection: {collection_name}")
+        records_count = await self.get_records_estimate(collection_name=collection_name)
+        if records_count < self.index_threshold:
+            return False
 
+        index_name = self.default_index_name(collection_name)
+        is_built = await self.build_vector_index(collection_name=collection_name, index_name=index_name,
+                                                 index_type=index_type, records_count=records_count)
+        if is_built:
+            self.known_indexes[index_name] = time.monotonic()
+
+        return is_built
+
+
+    async def reset_vector_index(self, collection_name: str, index_type: str = None) -> bool:
+        """
+        Rebuilds the vector index with parameters for the current collection size. An existing index
+        keeps serving searches until its replacement is built, then the two are swapped.
+        """
+        index_type = index_type or self.index_type
+        if index_type not in [t.value for t in PgVectorIndexTypeEnums]:
+            self.logger.error(f"Unsupported vector index type: {index_type}")
+            return False
+
+        if not await self.is_collection_existed(collection_name=collection_name):
+            return False
 
-    async def reset_vector_index(self, collection_name: str,
-                                 index_type: str = PgVectorIndexTypeEnums.HNSW.value) -> bool:
+        if not await self.is_index_existed(collection_name=collection_name):
+            return await self.create_vector_index(collection_name=collection_name, index_type=index_type)
+
+        records_count = await self.get_records_estimate(collection_name=collection_name)
+        if records_count < self.index_threshold:
+            return False
 
         index_name = self.default_index_name(collection_name)
-        async with self.db_client() as session:
-            async with session.begin():
-                drop_sql = sql_text(f'DROP INDEX IF EXISTS {index_name}')
-                await session.execute(drop_sql)
+        rebuild_index_name = f"{index_name}_rebuild"
+        is_built = await self.build_vector_index(collection_name=collection_name, index_name=rebuild_index_name,
+                                                 index_type=index_type, records_count=records_count)
+        if not is_built:
+            return False
+
+        async with self.db_engine.connect() as connection:
+            connection = await connection.execution_options(isolation_level="AUTOCOMMIT")
+            await connection.execute(sql_text(f'DROP INDEX CONCURRENTLY IF EXISTS {index_name}'))
+            await connection.execute(sql_text(f'ALTER INDEX {rebuild_index_name} RENAME TO {index_name}'))
 
-        return await self.create_vector_index(collection_name=collection_name, index_type=index_type)
+        self.known_indexes[index_name] = time.monotonic()
+
+        return True
 
 
     async def insert_one(self, collection_name: str, text: str, vector: list,
@@ -227,92 +447,266 @@ class PGVectorProvider(VectorDBInterface):
                 metadata_json = json.dumps(metadata, ensure_ascii=False) if metadata is not None else "{}"
                 await session.execute(insert_sql, {
                     'text': text,
-                    'vector': "[" + ",".join([str(v) for v in vector]) + "]",
+                    'vector': self.to_db_vector(vector),
                     'metadata': metadata_json,
                     'chunk_id': record_id
                 })
                 await session.commit()
 
-                await self.create_vector_index(collection_name=collection_name)
-
         return True
 
 
     async def insert_many(self, collection_name: str, texts: list,
                           vectors: list, metadata: list = None,
                           record_ids: list = None, batch_size: int = 50):
+        """
+        Inserts one row per (record_id, vector) with a single COPY. The row text and metadata are read
+        from the chunks table by `record_ids` (chunk ids), so `texts` and `metadata` are not sent and
+        `batch_size` does not apply; they stay in the signature for the other providers.
+        """
 
         is_collection_existed = await self.is_collection_existed(collection_name=collection_name)
         if not is_collection_existed:
             self.logger.error(f"Can not insert new records to non-existed collection: {collection_name}")
             return False
 
-        if len(vectors) != len(record_ids):
+        if record_ids is None or len(vectors) != len(record_ids):
             self.logger.error(f"Invalid data items for collection: {collection_name}")
             return False
 
-        if not metadata or len(metadata) == 0:
-            metadata = [None] * len(texts)
+        # a collection dropped by another worker may still be cached; recheck the catalog and retry once
+        for _ in range(2):
+            try:
+                await self.copy_records(collection_name=collection_name, vectors=vectors, record_ids=record_ids)
+                return True
+            except ProgrammingError as e:
+                self.forget_collection(collection_name)
+                self.logger.error(f"Error while inserting records into collection {collection_name}: {e}")
+
+                if not await self.is_collection_existed(collection_name=collection_name):
+                    return False
+
+        return False
+
+
+    async def copy_records(self, collection_name: str, vectors: list, record_ids: list):
+        # text and metadata are read from the chunks table, only (chunk_id, vector) rows are streamed
+        staging_table = f'{collection_name}_staging'
+        async with self.db_client() as session:
+            async with session.begin():
+                # temp tables skip the WAL; the staging columns take the collection's exact types
+                await session.execute(sql_text(
+                    f'CREATE TEMP TABLE {staging_table} ON COMMIT DROP AS '
+                    f'SELECT {PgVectorTableSchemeEnums.CHUNK_ID.value}, '
+                    f'{PgVectorTableSchemeEnums.VECTOR.value} '
+                    f'FROM {collection_name} WITH NO DATA'
+                ))
+
+                connection = await session.connection()
+                raw_connection = await connection.get_raw_connection()
+                await raw_connection.driver_connection.copy_records_to_table(
+                    staging_table,
+                    records=[
+                        (_record_id, self.to_db_vector(_vector))
+                        for _record_id, _vector in zip(record_ids, vectors)
+                    ],
+                    columns=[PgVectorTableSchemeEnums.CHUNK_ID.value, PgVectorTableSchemeEnums.VECTOR.value],
+                )
+
+                insert_sql = sql_text(
+                    f'INSERT INTO {collection_name} '
+                    f'({PgVectorTableSchemeEnums.TEXT.value}, '
+                    f'{PgVectorTableSchemeEnums.VECTOR.value}, '
+                    f'{PgVectorTableSchemeEnums.METADATA.value}, '
+                    f'{PgVectorTableSchemeEnums.CHUNK_ID.value}) '
+                    f'SELECT chunks.chunk_text, staging.{PgVectorTableSchemeEnums.VECTOR.value}, '
+                    f'COALESCE(chunks.chunk_metadata, \'{{}}\'), '
+                    f'staging.{PgVectorTableSchemeEnums.CHUNK_ID.value} '
+                    f'FROM {staging_table} staging '
+                    f'JOIN chunks ON chunks.chunk_id = staging.{PgVectorTableSchemeEnums.CHUNK_ID.value}'
+                )
+                await session.execute(insert_sql)
+
+
+    async def start_bulk_load(self, collection_name: str, drop_index: bool = False):
+        """
+        Starts a load whose vector index is built by `finish_bulk_load`. `drop_index` also drops the
+        index of an empty collection, so a load into it does not add rows to HNSW/IVFFlat one by one.
+        The index of a collection with rows is kept: searches keep using it during the load.
+        """
+        self.bulk_loading_collections[collection_name] += 1
+
+        if drop_index and await self.is_collection_empty(collection_name=collection_name):
+            index_name = self.default_index_name(collection_name)
+            async with self.db_engine.connect() as connection:
+                connection = await connection.execution_options(isolation_level="AUTOCOMMIT")
+                await connection.execute(sql_text(f'DROP INDEX CONCURRENTLY IF EXISTS {index_name}'))
+            self.known_indexes.pop(index_name, None)
+
+        return True
+
+
+    async def is_collection_empty(self, collection_name: str) -> bool:
+        async with self.db_client() as session:
+            async with session.begin():
+                has_rows = await session.execute(sql_text(f'SELECT EXISTS (SELECT 1 FROM {collection_name})'))
+                return not has_rows.scalar_one()
+
+
+    async def finish_bulk_load(self, collection_name: str):
+        self.bulk_loading_collections[collection_name] -= 1
+        if self.bulk_loading_collections[collection_name] > 0:
+            return True
+        del self.bulk_loading_collections[collection_name]
+
+        if not await self.is_collection_existed(collection_name=collection_name):
+            return False
 
         async with self.db_client() as session:
             async with session.begin():
-                for i in range(0, len(texts), batch_size):
-                    batch_texts = texts[i:i + batch_size]
-                    batch_vectors = vectors[i:i + batch_size]
-                    batch_metadata = metadata[i:i + batch_size]
-                    batch_record_ids = record_ids[i:i + batch_size]
-
-                    values = []
-
-                    for _text, _vector, _metadata, _record_id in zip(batch_texts, batch_vectors, batch_metadata,
-                                                                     batch_record_ids):
-                        metadata_json = json.dumps(_metadata, ensure_ascii=False) if _metadata is not None else "{}"
-                        values.append({
-                            'text': _text,
-                            'vector': "[" + ",".join([str(v) for v in _vector]) + "]",
-                            'metadata': metadata_json,
-                            'chunk_id': _record_id
-                        })
-
-                    batch_insert_sql = sql_text(f'INSERT INTO {collection_name} '
-                                                f'({PgVectorTableSchemeEnums.TEXT.value}, '
-                                                f'{PgVectorTableSchemeEnums.VECTOR.value}, '
-                                                f'{PgVectorTableSchemeEnums.METADATA.value}, '
-                                                f'{PgVectorTableSchemeEnums.CHUNK_ID.value}) '
-                                                f'VALUES (:text, :vector, :metadata, :chunk_id)')
-
-                    await session.execute(batch_insert_sql, values)
+                # fresh planner statistics for the loaded rows
+                await session.execute(sql_text(f'ANALYZE {collection_name}'))
 
         await self.create_vector_index(collection_name=collection_name)
 
         return True
 
 
-    async def search_by_vector(self, collection_name: str, vector: list, limit: int):
+    async def delete_by_record_ids(self, collection_name: str, record_ids: list):
+
+        if not record_ids:
+            return True
+
+        is_collection_existed = await self.is_collection_existed(collection_name=collection_name)
+        if not is_collection_existed:
+            return False
+
+        async with self.db_client() as session:
+            async with session.begin():
+                delete_sql = sql_text(f'DELETE FROM {collection_name} '
+                                      f'WHERE {PgVectorTableSchemeEnums.CHUNK_ID.value} = ANY(:record_ids)')
+                await session.execute(delete_sql, {"record_ids": list(record_ids)})
+
+        return True
+
+
+    def score_sql(self, distance_sql: str):
+        # higher is better: cosine similarity, or the negated L2 distance / inner product distance
+        if self.distance_operator == PgVectorDistanceOperatorEnums.COSINE.value:
+            return f'1 - ({distance_sql})'
+        return f'-({distance_sql})'
+
+    def build_search_sql(self, collection_name: str, limit: int, exact: bool = False):
+        distance_sql = f'{PgVectorTableSchemeEnums.VECTOR.value} {self.distance_operator} {self.query_vector_sql()}'
+
+        if self.quantization == VectorQuantizationEnums.BINARY.value and not exact:
+            # hamming KNN on the binary index, then rerank the candidates with full vectors
+            binary_distance_sql = (f'{self.binary_vector_sql(PgVectorTableSchemeEnums.VECTOR.value)} '
+                                   f'{PgVectorDistanceOperatorEnums.HAMMING.value} '
+                                   f'{self.binary_vector_sql(self.query_vector_sql())}')
+            return (
+                f'SELECT {PgVectorTableSchemeEnums.TEXT.value} as text, {self.score_sql(distance_sql)} as score'
+                f' FROM ('
+                f'SELECT {PgVectorTableSchemeEnums.TEXT.value}, {PgVectorTableSchemeEnums.VECTOR.value}'
+                f' FROM {collection_name}'
+                f' ORDER BY {binary_distance_sql}'
+                f' LIMIT {int(limit) * self.rescore_factor}'
+                f') candidates'
+                f' ORDER BY {distance_sql} '
+                f'LIMIT {int(limit)}'
+            )
+
+        return (
+            f'SELECT {PgVectorTableSchemeEnums.TEXT.value} as text, {self.score_sql(distance_sql)} as score'
+            f' FROM {collection_name}'
+            f' ORDER BY {distance_sql} '
+            f'LIMIT {int(limit)}'
+        )
+
+    async def apply_search_params(self, session, exact: bool = False, ef_search: int = None, probes: int = None):
+        """Transaction-local planner and index settings for the next search."""
+        if exact:
+            # exact scan over the stored vectors, used as the recall reference
+            await session.execute(sql_text('SET LOCAL enable_indexscan = off'))
+
+        search_params = {
+            PgVectorSearchParamEnums.HNSW_EF_SEARCH.value: ef_search,
+            PgVectorSearchParamEnums.IVFFLAT_PROBES.value: probes,
+        }
+        for param_name, param_value in search_params.items():
+            if param_value is not None:
+                await session.execute(sql_text('SELECT set_config(:param_name, :param_value, true)'),
+                                      {"param_name": param_name, "param_value": str(int(param_value))})
+
+    async def search_by_vector(self, collection_name: str, vector: list, limit: int, exact: bool = False,
+                               ef_search: int = None, probes: int = None):
 
         is_collection_existed = await self.is_collection_existed(collection_name=collection_name)
         if not is_collection_existed:
             self.logger.error(f"Can not search for records in a non-existed collection: {collection_name}")
             return False
 
-        vector = "[" + ",".join([str(v) for v in vector]) + "]"
+        vector = self.to_db_vector(vector)
+        try:
+            async with self.db_client() as session:
+                async with session.begin():
+                    await self.apply_search_params(session=session, exact=exact, ef_search=ef_search,
+                                                   probes=probes)
+
+                    search_sql = sql_text(self.build_search_sql(collection_name=collection_name, limit=limit,
+                                                                exact=exact))
+                    result = await session.execute(search_sql, {"vector": vector})
+
+                    records = result.fetchall()
+        except ProgrammingError as e:
+            # e.g. the collection was dropped by another worker since it was cached
+            self.forget_collection(collection_name)
+            self.logger.error(f"Error while searching collection {collection_name}: {e}")
+            return False
+
+        return [
+            RetrievedDocument(
+                text=record.text,
+                score=record.score
+            )
+            for record in records
+        ]
+
+    async def explain_search(self, collection_name: str, vector: list, limit: int,
+                             ef_search: int = None, probes: int = None):
+        """
+        EXPLAIN the KNN query `search_by_vector` would run; `uses_index` tells whether the plan
+        scans the collection's vector index instead of the whole table.
+        """
+        is_collection_existed = await self.is_collection_existed(collection_name=collection_name)
+        if not is_collection_existed:
+            return None
+
+        vector = self.to_db_vector(vector)
         async with self.db_client() as session:
             async with session.begin():
-                search_sql = sql_text(
-                    f'SELECT {PgVectorTableSchemeEnums.TEXT.value} as text, 1 - ({PgVectorTableSchemeEnums.VECTOR.value} <=> :vector) as score'
-                    f' FROM {collection_name}'
-                    ' ORDER BY score DESC '
-                    f'LIMIT {limit}'
-                    )
+                await self.apply_search_params(session=session, ef_search=ef_search, probes=probes)
 
-                result = await session.execute(search_sql, {"vector": vector})
+                explain_sql = sql_text('EXPLAIN (FORMAT JSON) '
+                                       + self.build_search_sql(collection_name=collection_name, limit=limit))
+                result = await session.execute(explain_sql, {"vector": vector})
+                query_plan = result.scalar_one()
 
-                records = result.fetchall()
+        if isinstance(query_plan, str):
+            query_plan = json.loads(query_plan)
 
-                return [
-                    RetrievedDocument(
-                        text=record.text,
-                        score=record.score
-                    )
-                    for record in records
-                ]
+        index_name = self.default_index_name(collection_name)
+        plan_nodes = [query_plan[0]["Plan"]]
+        scanned_indexes = []
+        while plan_nodes:
+            node = plan_nodes.pop()
+            if "Index Name" in node:
+                scanned_indexes.append(node["Index Name"])
+            plan_nodes.extend(node.get("Plans", []))
+
+        return {
+            "uses_index": index_name in scanned_indexes,
+            "index_name": index_name,
+            "scanned_indexes": scanned_indexes,
+            "query_plan": query_plan,
+        }
@@ -1,15 +1,17 @@
 from qdrant_client import models, QdrantClient
 from ..VectorDBInterface import VectorDBInterface
-from ..VectorDBEnums import DistanceMethodEnums
+from ..VectorDBEnums import DistanceMethodEnums, VectorQuantizationEnums
 import logging
 from typing import List
+from collections import Counter
 from models.db_schemes import RetrievedDocument
 
 
 class QdrantDBProvider(VectorDBInterface):
 
     def __init__(self, db_client: str, default_vector_size: int = 786,
-                 distance_method: str = None, index_threshold: int = 100):
+                 distance_method: str = None, index_threshold: int = 100,
+                 quantization: str = None, rescore_factor: float = 4.0):
 
         self.client = None
         self.db_client = db_client
@@ -21,6 +23,16 @@ class QdrantDBProvider(VectorDBInterface):
         elif distance_method == DistanceMethodEnums.DOT.value:
             self.distance_method = models.Distance.DOT
 
+        self.quantization = quantization or VectorQuantizationEnums.NONE.value
+        self.rescore_factor = rescore_factor
+
+        # qdrant's default, restored after a bulk load
+        self.indexing_threshold = 20000
+
+        # running loads per collection between start_bulk_load/finish_bulk_load; indexing is paused by
+        # the first one and restored once the last one finishes
+        self.bulk_loading_collections = Counter()
+
         self.logger = logging.getLogger('uvicorn')
 
     async def connect(self):
@@ -60,14 +72,35 @@ class QdrantDBProvider(VectorDBInterface):
                 collection_name=collection_name,
                 vectors_config=models.VectorParams(
                     size=embedding_size,
-                    distance=self.distance_method
-                )
+                    distance=self.distance_method,
+                    datatype=models.Datatype.FLOAT16
+                    if self.quantization == VectorQuantizationEnums.HALF.value else None
+                ),
+                quantization_config=self.get_quantization_config()
             )
 
             return True
 
         return False
 
+    def get_quantization_config(self):
+        # quantized vectors stay in RAM for the search; the originals can live on disk for rescoring
+        if self.quantization == VectorQuantizationEnums.SCALAR.value:
+            return models.ScalarQuantization(
+                scalar=models.ScalarQuantizationConfig(
+                    type=models.ScalarType.INT8,
+                    quantile=0.99,
+                    always_ram=True
+                )
+            )
+
+        if self.quantization == VectorQuantizationEnums.BINARY.value:
+            return models.BinaryQuantization(
+                binary=models.BinaryQuantizationConfig(always_ram=True)
+            )
+
+        return None
+
     async def insert_one(self, collection_name: str, text: str, vector: list,
                          metadata: dict = None,
                          record_id: str = None):
@@ -149,12 +182,90 @@ class QdrantDBProvider(VectorDBInterface):
 
         return True
 
-    async def search_by_vector(self, collection_name: str, vector: list, limit: int = 5):
+    async def start_bulk_load(self, collection_name: str, drop_index: bool = False):
+        self.bulk_loading_collections[collection_name] += 1
+        if self.bulk_loading_collections[collection_name] > 1:
+            return True
+
+        # indexing_threshold=0 stops HNSW building while points are uploaded
+        if not await self.is_collection_existed(collection_name):
+            return False
+
+        try:
+            _ = self.client.update_collection(
+                collection_name=collection_name,
+                optimizers_config=models.OptimizersConfigDiff(indexing_threshold=0),
+            )
+        except Exception as e:
+            self.logger.error(f"Error while disabling indexing: {e}")
+            return False
+
+        return True
+
+    async def finish_bulk_load(self, collection_name: str):
+        self.bulk_loading_collections[collection_name] -= 1
+        if self.bulk_loading_collections[collection_name] > 0:
+            return True
+        del self.bulk_loading_collections[collection_name]
+
+        return await self.enable_indexing(collection_name=collection_name)
+
+    async def enable_indexing(self, collection_name: str):
+        if not await self.is_collection_existed(collection_name):
+            return False
+
+        try:
+            _ = self.client.update_collection(
+                collection_name=collection_name,
+                optimizers_config=models.OptimizersConfigDiff(indexing_threshold=self.indexing_threshold),
+            )
+        except Exception as e:
+            self.logger.error(f"Error while enabling indexing: {e}")
+            return False
+
+        return True
+
+    async def reset_vector_index(self, collection_name: str, index_type: str = None) -> bool:
+        # qdrant always builds HNSW in its optimizer; re-applying the threshold queues the segments for
+        # indexing, including after an interrupted bulk load; a running load restores it when it finishes
+        if self.bulk_loading_collections[collection_name] > 0:
+            return False
+        return await self.enable_indexing(collection_name=collection_name)
+
+    async def delete_by_record_ids(self, collection_name: str, record_ids: list):
+
+        if not record_ids:
+            return True
+
+        if not await self.is_collection_existed(collection_name):
+            return False
+
+        try:
+            _ = self.client.delete(
+                collection_name=collection_name,
+                points_selector=models.PointIdsList(points=list(record_ids)),
+            )
+        except Exception as e:
+            self.logger.error(f"Error while deleting records: {e}")
+            return False
+
+        return True
+
+    async def search_by_vector(self, collection_name: str, vector: list, limit: int = 5, exact: bool = False,
+                               ef_search: int = None, probes: int = None):
+
+        quantization_params = None
+        if self.get_quantization_config() is not None and not exact:
+            quantization_params = models.QuantizationSearchParams(
+                rescore=True,
+                oversampling=self.rescore_factor
+            )
 
         results = self.client.search(
             collection_name=collection_name,
             query_vector=vector,
-            limit=limit
+            limit=limit,
+            search_params=models.SearchParams(hnsw_ef=ef_search, exact=exact, quantization=quantization_params)
         )
 
         if not results or len(results) == 0:
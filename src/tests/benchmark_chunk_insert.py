@@ -0,0 +1,81 @@
+"""
+Compare ChunkModel.bulk_insert_chunks (binary COPY) with the ORM session.add_all path it replaced.
+
+Opt-in, against the database of TEST_POSTGRES_URL (migrated with `alembic upgrade head`); from src/:
+
+    TEST_POSTGRES_URL=postgresql+asyncpg://... python -m tests.benchmark_chunk_insert --chunks 100000
+
+The inserted chunks belong to no project and are deleted after each run.
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from models.ChunkModel import ChunkModel
+from models.db_schemes import DataChunk
+
+
+def build_chunks(chunks_count: int):
+    return [
+        {
+            "chunk_text": f"benchmark chunk {i} " * 20,
+            "chunk_metadata": {"source": "benchmark", "page": i // 50},
+            "chunk_order": i + 1,
+            "chunk_project_id": None,
+            "chunk_asset_id": None,
+        }
+        for i in range(chunks_count)
+    ]
+
+
+async def insert_with_orm(db_client, chunks: list, batch_size: int = 100):
+    chunks_ids = []
+    async with db_client() as session:
+        async with session.begin():
+            for i in range(0, len(chunks), batch_size):
+                batch = [DataChunk(**chunk) for chunk in chunks[i:i + batch_size]]
+                session.add_all(batch)
+                await session.flush()
+                chunks_ids.extend(chunk.chunk_id for chunk in batch)
+    return chunks_ids
+
+
+async def run_benchmark(postgres_url: str, chunks_count: int):
+    db_engine = create_async_engine(postgres_url)
+    db_client = sessionmaker(db_engine, class_=AsyncSession, expire_on_commit=False)
+    chunk_model = await ChunkModel.create_instance(db_client=db_client)
+
+    chunks = build_chunks(chunks_count)
+    try:
+        for method_name, insert_chunks in (
+                ("orm add_all", lambda: insert_with_orm(db_client=db_client, chunks=chunks)),
+                ("binary COPY", lambda: chunk_model.bulk_insert_chunks(chunks=chunks)),
+        ):
+            started_at = time.perf_counter()
+            chunks_ids = await insert_chunks()
+            elapsed = time.perf_counter() - started_at
+
+            print(f"{method_name:>12}: {len(chunks_ids)} chunks in {elapsed:.2f}s "
+                  f"({len(chunks_ids) / elapsed:,.0f} chunks/s)")
+
+            # sliced to stay under the 32767 bind parameters of one statement
+            for i in range(0, len(chunks_ids), 10000):
+                _ = await chunk_model.delete_chunks_by_ids(chunks_ids=chunks_ids[i:i + 10000])
+    finally:
+        await db_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--chunks", type=int, default=50000, help="chunks inserted by each method")
+    args = parser.parse_args()
+
+    postgres_url = os.environ.get("TEST_POSTGRES_URL")
+    if not postgres_url:
+        raise SystemExit("TEST_POSTGRES_URL is not set")
+
+    asyncio.run(run_benchmark(postgres_url=postgres_url, chunks_count=args.chunks))
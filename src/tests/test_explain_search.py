@@ -0,0 +1,78 @@
+import asyncio
+import os
+
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.sql import text as sql_text
+
+from stores.vectordb.VectorDBEnums import DistanceMethodEnums, PgVectorTableSchemeEnums
+from stores.vectordb.providers.PGVectorProvider import PGVectorProvider
+
+# postgresql+asyncpg URL of a database migrated with `alembic upgrade head` (collections reference chunks)
+TEST_POSTGRES_URL = os.environ.get("TEST_POSTGRES_URL")
+
+pytestmark = pytest.mark.skipif(not TEST_POSTGRES_URL, reason="TEST_POSTGRES_URL is not set")
+
+COLLECTION_NAME = "collection_explain_search_test"
+VECTOR_SIZE = 16
+RECORDS_COUNT = 20000
+
+
+def get_plan_nodes(query_plan: list):
+    plan_nodes = [query_plan[0]["Plan"]]
+    while plan_nodes:
+        node = plan_nodes.pop()
+        yield node
+        plan_nodes.extend(node.get("Plans", []))
+
+
+async def explain_indexed_search():
+    db_engine = create_async_engine(TEST_POSTGRES_URL)
+    db_client = sessionmaker(db_engine, class_=AsyncSession, expire_on_commit=False)
+
+    vectordb_client = PGVectorProvider(
+        db_client=db_client,
+        db_engine=db_engine,
+        default_vector_size=VECTOR_SIZE,
+        distance_method=DistanceMethodEnums.COSINE.value,
+    )
+
+    try:
+        await vectordb_client.connect()
+        _ = await vectordb_client.create_collection(collection_name=COLLECTION_NAME, embedding_size=VECTOR_SIZE,
+                                                    do_reset=True)
+
+        # the index is built by finish_bulk_load, as after a real push
+        _ = await vectordb_client.start_bulk_load(collection_name=COLLECTION_NAME)
+        async with db_client() as session:
+            async with session.begin():
+                # random vectors without chunks; the correlated `i > 0` draws a new vector per row
+                await session.execute(sql_text(
+                    f'INSERT INTO {COLLECTION_NAME} '
+                    f'({PgVectorTableSchemeEnums.TEXT.value}, {PgVectorTableSchemeEnums.VECTOR.value}) '
+                    f'SELECT \'record \' || i, CAST(ARRAY('
+                    f'SELECT random() FROM generate_series(1, {VECTOR_SIZE}) WHERE i > 0'
+                    f') AS vector({VECTOR_SIZE})) '
+                    f'FROM generate_series(1, {RECORDS_COUNT}) AS i'
+                ))
+        _ = await vectordb_client.finish_bulk_load(collection_name=COLLECTION_NAME)
+
+        return await vectordb_client.explain_search(collection_name=COLLECTION_NAME,
+                                                    vector=[0.5] * VECTOR_SIZE, limit=10)
+    finally:
+        _ = await vectordb_client.delete_collection(collection_name=COLLECTION_NAME)
+        await db_engine.dispose()
+
+
+def test_explain_search_scans_vector_index():
+    explained = asyncio.run(explain_indexed_search())
+
+    assert explained is not None
+    assert explained["uses_index"]
+
+    index_scans = [
+        node for node in get_plan_nodes(explained["query_plan"])
+        if node["Node Type"] == "Index Scan" and node.get("Index Name") == explained["index_name"]
+    ]
+    assert len(index_scans) == 1